@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3, 7):
+    # async generators are a syntax error before Python 3.6 and
+    # asyncio.run is new in 3.7
+    collect_ignore.append("fp/aio.py")
@@ -1,8 +1,14 @@
 """
 A collection of functional programming inspired tools for Python.
 """
+import copy
 import operator
 import itertools
+import sys
+import time
+from collections import deque
+from array import array
+import six
 from six import moves
 from fp.missing_six import ifilter
 
@@ -14,8 +20,26 @@ __version__ = "0.2"
 # atoms
 ####
 class atom(object):
-    def __init__(self, name):
+    """
+    A named sentinel value.  Atoms bound to a module global of the same
+    name, with `module` set to the module's name, are pickled by
+    reference and keep their identity:
+
+    >>> import pickle
+    >>> pickle.loads(pickle.dumps(undefined)) is undefined
+    True
+
+    Other atoms are pickled as a new atom with the same name.
+    """
+    def __init__(self, name, module=None):
         self.name = name
+        self.__module__ = module
+
+    def __reduce__(self):
+        mod = sys.modules.get(self.__module__)
+        if mod is not None and getattr(mod, self.name, None) is self:
+            return self.name
+        return atom, (self.name,)
 
     def __repr__(self):
         """
@@ -24,7 +48,7 @@ class atom(object):
         """
         return self.name
 
-undefined = atom("undefined")
+undefined = atom("undefined", __name__)
 
 ###
 # Higher-Order functions
@@ -68,6 +92,146 @@ This is the equivalence to these expressions
     return inner
 
 
+def _required_params(func):
+    """
+    Returns the names of the required positional parameters of `func`
+    and the set of its required keyword-only parameters
+    """
+    try:
+        from inspect import signature, Parameter
+    except ImportError:  # pragma: no cover
+        from inspect import getargspec
+        spec = getargspec(func)
+        n = len(spec.args) - len(spec.defaults or ())
+        return tuple(spec.args[:n]), frozenset()
+
+    positional = []
+    keyword_only = set()
+    for param in signature(func).parameters.values():
+        if param.default is not Parameter.empty:
+            continue
+        elif param.kind in (Parameter.POSITIONAL_ONLY,
+                            Parameter.POSITIONAL_OR_KEYWORD):
+            positional.append(param.name)
+        elif param.kind == Parameter.KEYWORD_ONLY:
+            keyword_only.add(param.name)
+    return tuple(positional), frozenset(keyword_only)
+
+
+class _CurrySpec(object):
+    """
+    What curry learned about a function when it was decorated
+    """
+    __slots__ = ("func", "arity", "index", "keyword_only")
+
+    def __init__(self, func, names, keyword_only):
+        self.func = func
+        self.arity = len(names)
+        self.index = dict((name, i) for i, name in enumerate(names))
+        self.keyword_only = keyword_only
+
+
+class _Curried(object):
+    """
+    A curried function with the arguments applied so far
+    """
+    __slots__ = ("_func", "_arity", "_spec", "_args", "_kwargs")
+
+    def __init__(self, spec, args, kwargs):
+        self._func = spec.func
+        # keyword-only parameters are checked on the slow path
+        self._arity = sys.maxsize if spec.keyword_only else spec.arity
+        self._spec = spec
+        self._args = args
+        self._kwargs = kwargs
+
+    def __call__(self, *args, **kwargs):
+        if self._args:
+            args = self._args + args
+        if not kwargs and not self._kwargs:
+            if len(args) >= self._arity:
+                return self._func(*args)
+            return _Curried(self._spec, args, self._kwargs)
+
+        spec = self._spec
+        if self._kwargs:
+            kwargs = dict(self._kwargs, **kwargs)
+        n = len(args)
+        # keywords naming required positional parameters count too
+        given = n + sum(1 for k in kwargs if spec.index.get(k, -1) >= n)
+        if given >= spec.arity and spec.keyword_only.issubset(kwargs):
+            return self._func(*args, **kwargs)
+        return _Curried(spec, args, kwargs)
+
+    def __get__(self, obj, objtype=None):
+        # bind the instance as the first argument, like a function
+        if obj is None:
+            return self
+        return _Curried(self._spec, (obj,) + self._args, self._kwargs)
+
+    @property
+    def __name__(self):
+        return self._func.__name__
+
+    @property
+    def __doc__(self):
+        return self._func.__doc__
+
+    def __repr__(self):
+        return "<curried {0} args={1!r} kwargs={2!r}>".format(
+            self.__name__, self._args, self._kwargs)
+
+
+def curry(func, arity=None):
+    """
+..function::curry(func[, arity]) -> curried callable
+
+Returns a curried version of `func`.  Calling it with fewer arguments
+than `func` requires returns a partial application that takes the
+rest; arguments may be given one or many at a time:
+
+    >>> @curry
+    ... def add3(a, b, c):
+    ...     return a + b + c
+    >>> add3(1)(2)(3), add3(1, 2)(3), add3(1)(2, 3), add3(1, 2, 3)
+    (6, 6, 6, 6)
+
+Parameters with defaults are optional, and required parameters may be
+passed by keyword:
+
+    >>> @curry
+    ... def greet(greeting, name, punctuation="!"):
+    ...     return greeting + ", " + name + punctuation
+    >>> greet(name="World")("Hello")
+    'Hello, World!'
+
+The signature is analysed once, when `func` is curried, and partial
+applications are flat objects holding the arguments so far, so calling
+them costs about as much as calling a :func:`functools.partial`.
+Pass `arity` for functions whose signature cannot be inspected or that
+take `*args`:
+
+    >>> list(map(curry(max, 2)(3), [1, 5]))
+    [3, 5]
+
+Curried methods bind the instance like plain methods:
+
+    >>> class Scale(object):
+    ...     def __init__(self, factor):
+    ...         self.factor = factor
+    ...     @curry
+    ...     def affine(self, x, offset):
+    ...         return self.factor * x + offset
+    >>> Scale(2).affine(3)(1)
+    7
+    """
+    if arity is None:
+        names, keyword_only = _required_params(func)
+    else:
+        names, keyword_only = tuple(moves.range(arity)), frozenset()
+    return _Curried(_CurrySpec(func, names, keyword_only), (), {})
+
+
 def c(f, g):
     """..function::c(f : callable, g : callable) -> callable
 Returns a new function which is the equivalent to
@@ -167,7 +331,7 @@ Optionally, needed keys can be passed in:
     return inner
 
 
-def trampoline(f):
+def trampoline(f, max_steps=None, deadline=None):
     """
     Use f() as a continuation of a tail-recursive funciton.
 
@@ -186,10 +350,30 @@ def trampoline(f):
     >>> counter(2000)
     2000
 
+    The work can be bounded by a number of steps, or by a `deadline`
+    compared to `time.time()`.  When the budget runs out the pending
+    continuation is returned instead of the result; it is callable, so
+    it cannot be mistaken for one, and trampolining it resumes the
+    computation:
 
+    >>> k = trampoline(counter_(0, 2000), max_steps=1500)
+    >>> callable(k)
+    True
+    >>> trampoline(k, max_steps=1500)
+    2000
     """
+    if max_steps is None and deadline is None:
+        while callable(f):
+            f = f()
+        return f
+
+    steps = 0
     while callable(f):
+        if max_steps is not None and steps >= max_steps or (
+                deadline is not None and time.time() >= deadline):
+            return f
         f = f()
+        steps += 1
     return f
 
 
@@ -207,11 +391,115 @@ A function that returns what is passed to it.
     return x
 
 
+###
+## Vectorization
+###
+_VECTORIZED = {}
+
+
+def register_vectorized(f, vf):
+    """..function::register_vectorized(f, vf) -> None
+
+Registers `vf` as the vectorized twin of `f`.  When :func:`izipwith`,
+:func:`allmap` or :func:`anymap` are given numpy arrays of one shape,
+`vf` is called once with the whole arrays instead of calling `f` on
+every element.
+
+    >>> def positive(x):
+    ...     return x > 0
+    >>> register_vectorized(positive, lambda xs: xs > 0)
+    >>> vectorized(positive) is not None
+    True
+    """
+    _VECTORIZED[f] = vf
+
+
+def vectorized(f):
+    """..function::vectorized(f) -> callable | None
+
+Returns the vectorized twin of `f` or None if none is registered
+
+    >>> vectorized(even) is not None
+    True
+
+    >>> vectorized(lambda x: x) is None
+    True
+    """
+    return _VECTORIZED.get(f)
+
+
+def _ndarray(x):
+    """
+    Returns `x` if it is a numpy array of at least one dimension, or
+    None.  numpy is only looked up if it has already been imported,
+    since no other value can be an array.
+    """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(x, numpy.ndarray) and x.ndim:
+        return x
+    return None
+
+
+def _vectorize(f, iterables):
+    """
+    Returns the vectorized twin of `f` and `iterables` as arrays, or
+    None if `f` has to be applied element by element.
+
+    Only numpy arrays of one shape are dispatched: their elements are
+    numpy scalars with the same fixed-width semantics as the whole
+    array, whereas other buffers iterate as Python numbers and arrays
+    of different lengths would be broadcast instead of truncated.
+    """
+    vf = _VECTORIZED.get(f)
+    if vf is None:
+        return None
+    arrays = tuple(moves.map(_ndarray, iterables))
+    if any(a is None for a in arrays):
+        return None
+    shape = arrays[0].shape
+    if any(a.shape != shape for a in arrays[1:]):
+        return None
+    return vf, arrays
+
+
 ###
 ## iterators
 ###
 
 
+# immutable buffers whose memoryview iterates like the buffer itself,
+# so slices can be taken as zero-copy views.  Resizable buffers are
+# indexed instead, since an exported view would lock their size.
+_VIEW_TYPES = (bytes, memoryview)
+
+# sequences known to index in constant time; other sequences, such as
+# deques, may walk to each index and are iterated instead
+_INDEX_TYPES = (list, tuple, moves.range, six.text_type, bytearray, array)
+
+
+def _islice_random(iterable, start, stop):
+    """
+    Returns an iterator over iterable[start:stop] using direct indexing
+    or a zero-copy view when `iterable` supports random access, or None
+    when it has to be walked like any other iterator.
+    """
+    if not (isinstance(start, six.integer_types) and start >= 0 and
+            (stop is None or
+             isinstance(stop, six.integer_types) and stop >= 0)):
+        # left to islice, which accepts None and rejects negatives
+        return None
+    elif isinstance(iterable, _VIEW_TYPES):
+        return iter(memoryview(iterable)[start:stop])
+    elif hasattr(iterable, "__array_interface__"):
+        # numpy arrays slice to views
+        return iter(iterable[start:stop])
+    elif isinstance(iterable, _INDEX_TYPES):
+        indices = moves.range(*slice(start, stop).indices(len(iterable)))
+        return moves.map(iterable.__getitem__, indices)
+    else:
+        return None
+
+
 def itake(n, iterable):
     """
 Takes n items off the iterable:
@@ -221,8 +509,17 @@ Takes n items off the iterable:
 
     >>> list(itake(3, []))
     []
+
+    >>> list(itake(2, b"abc"))
+    [97, 98]
+
+    >>> list(itake(2, (x for x in range(5))))
+    [0, 1]
     """
-    return itertools.islice(iterable, 0, n)
+    it = _islice_random(iterable, 0, n)
+    if it is None:
+        return itertools.islice(iterable, 0, n)
+    return it
 
 
 def idrop(n, iterable):
@@ -235,8 +532,30 @@ Drops the first `n` items off the iterator
 
     >>> list(idrop(3, []))
     []
+
+Lists, tuples, strings, ranges, arrays and buffers are indexed directly
+so the dropped items are never visited; other iterables, including
+deques, are walked:
+
+    >>> list(idrop(2, ['a', 'b', 'c', 'd']))
+    ['c', 'd']
+
+    >>> from array import array
+    >>> list(idrop(2, array('d', [1.0, 2.0, 3.0])))
+    [3.0]
+
+    >>> list(idrop(None, [1, 2]))
+    [1, 2]
+
+    >>> list(idrop(-1, [1, 2, 3]))  # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+        ...
+    ValueError: Indices for islice() must be None or an integer
     """
-    return itertools.islice(iterable, n, None)
+    it = _islice_random(iterable, n, None)
+    if it is None:
+        return itertools.islice(iterable, n, None)
+    return it
 
 
 def isplitat(i, iterable):
@@ -251,11 +570,298 @@ yields two iterators split at index `i`
     ...     isplitat(3, range(6))
     ... )
     [[0, 1, 2], [3, 4, 5]]
+
+For lists, tuples and buffers the two halves are independent, so the
+second can be consumed before the first:
+
+    >>> head, tail = isplitat(2, [1, 2, 3, 4])
+    >>> list(tail), list(head)
+    ([3, 4], [1, 2])
+    """
+
+    head = _islice_random(iterable, 0, i)
+    if head is None:
+        iterator = iter(iterable)
+        yield itake(i, iterator)
+        yield iterator
+    else:
+        yield head
+        yield _islice_random(iterable, i, None)
+
+
+def ichunk(n, iterable):
+    """..function::ichunk(n, iterable)
+
+yields tuples of `n` items; the last chunk may be shorter
+
+    >>> list(ichunk(2, range(5)))
+    [(0, 1), (2, 3), (4,)]
+
+    >>> list(ichunk(2, []))
+    []
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = tuple(itertools.islice(iterator, n))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _par_map_chunks(task, iterable, chunksize, executor=None):
     """
+    Yields `task(chunk)` for each chunk of `chunksize` items of
+    `iterable`, in order, running the tasks on a `concurrent.futures`
+    executor, or on a process pool of its own when `executor` is None.
+    At most twice the CPU count of chunks are in flight, so the input
+    is streamed rather than read up front.
+
+    >>> list(_par_map_chunks(sum, range(7), 3, None))
+    [3, 12, 6]
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor()
+    limit = 2 * (os.cpu_count() or 1) if hasattr(os, "cpu_count") else 4
+
+    try:
+        pending = deque()
+        for chunk in ichunk(chunksize, iterable):
+            pending.append(executor.submit(task, chunk))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+def iwindow(n, iterable, step=1):
+    """..function::iwindow(n, iterable[, step=1])
+
+yields sliding windows of `n` items, advancing `step` items at a
+time.  Trailing items that do not fill a window are dropped.
+
+    >>> list(iwindow(3, range(5)))
+    [(0, 1, 2), (1, 2, 3), (2, 3, 4)]
+
+    >>> list(iwindow(2, range(7), step=2))
+    [(0, 1), (2, 3), (4, 5)]
+
+    >>> list(iwindow(3, range(2)))
+    []
+
+    >>> list(iwindow(0, range(2)))
+    Traceback (most recent call last):
+        ...
+    ValueError: iwindow needs n >= 1 and step >= 1
+    """
+    if n < 1 or step < 1:
+        raise ValueError("iwindow needs n >= 1 and step >= 1")
+    iterator = iter(iterable)
+    # a bounded deque is a ring buffer: appends evict the oldest items
+    window = deque(itertools.islice(iterator, n), maxlen=n)
+    if len(window) < n:
+        return
+    yield tuple(window)
+
+    skip, take = max(step - n, 0), min(step, n)
+    while True:
+        items = tuple(itertools.islice(iterator, skip, skip + take))
+        if len(items) < take:
+            return
+        window.extend(items)
+        yield tuple(window)
+
+
+def ibatch_array(n, iterable, dtype=float):
+    """..function::ibatch_array(n, iterable[, dtype=float])
+
+yields numpy arrays of `n` items; the last batch may be shorter.
+
+Batches are filled straight from the iterator with
+:func:`numpy.fromiter` so no intermediate lists are built.  numpy
+arrays are sliced into views instead of being copied, unless they
+have to be converted to `dtype`.
+
+    >>> for batch in ibatch_array(2, range(5), dtype=int):
+    ...     print(batch.tolist())
+    [0, 1]
+    [2, 3]
+    [4]
+
+    >>> import numpy
+    >>> [b.dtype.name for b in ibatch_array(2, numpy.arange(3))]
+    ['float64', 'float64']
+    """
+    import numpy
+
+    if isinstance(iterable, numpy.ndarray):
+        for i in moves.range(0, len(iterable), n):
+            yield iterable[i:i + n].astype(dtype, copy=False)
+        return
 
     iterator = iter(iterable)
-    yield itake(i, iterator)
-    yield iterator
+    while True:
+        batch = numpy.fromiter(itertools.islice(iterator, n), dtype)
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+# items are spilled to disk in pickled blocks of this many items
+_SPILL_BLOCK = 4096
+
+
+def _spill(items, f=None):
+    """
+    Writes items to the temporary file `f`, or a new one, returning
+    the file
+    """
+    import pickle
+    import tempfile
+
+    if f is None:
+        f = tempfile.TemporaryFile()
+    for block in ichunk(_SPILL_BLOCK, items):
+        pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+    return f
+
+
+def _unspill(f):
+    """
+    Yields the items written to `f` by :func:`_spill` and closes it
+    """
+    import pickle
+
+    f.seek(0)
+    try:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            for item in block:
+                yield item
+    finally:
+        f.close()
+
+
+def isort(key, iterable, max_memory=64 << 20):
+    """..function::isort(key, iterable[, max_memory=64MB])
+
+yields the items of `iterable` sorted by `key`, like
+`sorted(iterable, key=key)` but without holding every item in memory.
+
+Items are buffered until their estimated size, from
+:func:`sys.getsizeof`, passes `max_memory` bytes.  Each full buffer is
+sorted and spilled to a temporary file, and the sorted runs are merged
+lazily.  The sort is stable.
+
+    >>> list(isort(abs, [3, -1, 2, -3, 0], max_memory=200))
+    [0, -1, 2, 3, -3]
+
+Keys may be any orderable value, including a Maybe from
+:func:`fp.collections.get`; Nothing sorts first:
+
+    >>> from fp.monads.maybe import Maybe
+    >>> from fp.collections import get
+    >>> rows = [{'n': 2}, {}, {'n': 1}]
+    >>> list(isort(p(get, Maybe, 'n'), rows))
+    [{}, {'n': 1}, {'n': 2}]
+    """
+    import heapq
+
+    runs = []
+    buf = []
+    size = 0
+    # items are decorated with their input position so equal keys keep
+    # their order and the items themselves are never compared
+    for i, x in enumerate(iterable):
+        buf.append((key(x), i, x))
+        size += sys.getsizeof(x)
+        if size > max_memory:
+            buf.sort()
+            runs.append(_spill(buf))
+            buf = []
+            size = 0
+
+    buf.sort()
+    if not runs:
+        merged = buf
+    else:
+        merged = heapq.merge(*([_unspill(f) for f in runs] + [buf]))
+    return (x for _, _, x in merged)
+
+
+def igroup_by(key, iterable, max_memory=64 << 20, partitions=64):
+    """..function::igroup_by(key, iterable[, max_memory=64MB][, partitions=64])
+
+yields `(key, items)` pairs grouping every item of `iterable` by
+`key`.  Unlike :func:`itertools.groupby` the input does not need to be
+sorted; groups come out in no particular order.
+
+Items are grouped in a dict until their estimated size passes
+`max_memory` bytes.  Then they are spilled to one of `partitions`
+temporary files by the hash of their key, and each partition is
+grouped in turn once the input is exhausted.
+
+    >>> sorted(igroup_by(len, ["a", "bb", "c", "dd", "eee"]))
+    [(1, ['a', 'c']), (2, ['bb', 'dd']), (3, ['eee'])]
+
+    >>> grouped = igroup_by(even, range(10), max_memory=100)
+    >>> sorted(grouped)
+    [(False, [1, 3, 5, 7, 9]), (True, [0, 2, 4, 6, 8])]
+    """
+    groups = {}
+    files = None
+    size = 0
+
+    def spill():
+        for k, items in groups.items():
+            i = hash(k) % partitions
+            if files[i] is None:
+                files[i] = _spill([(k, items)])
+            else:
+                _spill([(k, items)], files[i])
+
+    for x in iterable:
+        k = key(x)
+        group = groups.get(k)
+        if group is None:
+            group = groups[k] = []
+        group.append(x)
+        size += sys.getsizeof(x)
+        if size > max_memory:
+            if files is None:
+                files = [None] * partitions
+            spill()
+            groups = {}
+            size = 0
+
+    if files is None:
+        for item in groups.items():
+            yield item
+        return
+
+    spill()
+    groups = None
+    for f in files:
+        if f is None:
+            continue
+        part = {}
+        for k, items in _unspill(f):
+            group = part.get(k)
+            if group is None:
+                part[k] = items
+            else:
+                group.extend(items)
+        for item in part.items():
+            yield item
 
 
 def izipwith(f, iterable1, iterable2):
@@ -264,7 +870,27 @@ def izipwith(f, iterable1, iterable2):
 
     >>> list(izipwith(lambda x,y: (x,y), [1,2], [3,4]))
     [(1, 3), (2, 4)]
+
+    When both iterables are numpy arrays of the same shape and `f`
+    has a vectorized twin (see :func:`register_vectorized`), the twin
+    is applied to the whole arrays, for instance
+    `izipwith(operator.add, a, b)` becomes `a + b`.
+
+    Anything else is zipped element by element, so arrays of
+    different lengths stop at the shorter one and other buffers keep
+    Python number semantics:
+
+    >>> import numpy
+    >>> [int(x) for x in izipwith(
+    ...     operator.add, numpy.array([1, 2, 3]), numpy.array([10, 20]))]
+    [11, 22]
+    >>> list(izipwith(operator.pow, array('l', [2, 2]), array('l', [3, -1])))
+    [8, 0.5]
     """
+    vec = _vectorize(f, (iterable1, iterable2))
+    if vec is not None:
+        vf, (a, b) = vec
+        return vf(a, b)
     return moves.map(f, iterable1, iterable2)
 
 
@@ -295,7 +921,16 @@ def allmap(f, iterable):
     >>> allmap(even, [2, 4, 6, 8])
     True
 
+    Vectorized predicates are reduced over numpy arrays in one call:
+
+    >>> import numpy
+    >>> allmap(even, numpy.array([2, 4, 6]))
+    True
     """
+    vec = _vectorize(f, (iterable,))
+    if vec is not None:
+        vf, (a,) = vec
+        return bool(vf(a).all())
     return all(moves.map(f, iterable))
 
 
@@ -308,10 +943,137 @@ def anymap(f, iterable):
 
     >>> anymap(even, [1, 3, 7])
     False
+
+    >>> import numpy
+    >>> anymap(odd, numpy.array([2, 4, 7]))
+    True
     """
+    vec = _vectorize(f, (iterable,))
+    if vec is not None:
+        vf, (a,) = vec
+        return bool(vf(a).any())
     return any(moves.map(f, iterable))
 
 
+def reduce_by_key(key, reducer, iterable, init, combiner=None,
+                  max_keys=None, partitions=64):
+    """..function::reduce_by_key(key, reducer, iterable, init[, combiner])
+
+yields `(k, acc)` pairs where `acc` reduces the items whose key is `k`
+with `reducer(acc, item)`, starting from a shallow copy of `init`
+made for each key.  Only one accumulator is kept per key, never the
+items themselves.
+
+    >>> sorted(reduce_by_key(len, lambda n, _: n + 1, ["a", "bb", "c"], 0))
+    [(1, 2), (2, 1)]
+
+The copy lets reducers update a mutable accumulator in place:
+
+    >>> def append(xs, x):
+    ...     xs.append(x)
+    ...     return xs
+    >>> sorted(reduce_by_key(len, append, ["a", "bb", "c"], []))
+    [(1, ['a', 'c']), (2, ['bb'])]
+
+To bound memory pass `max_keys` and a `combiner(acc1, acc2)` merging
+two accumulators of a key.  When there are more than `max_keys`
+accumulators, the least recently updated half is spilled to one of
+`partitions` temporary files by the hash of their key, and the
+spilled accumulators are combined once the input is exhausted:
+
+    >>> counts = reduce_by_key(lambda x: x % 10, lambda n, _: n + 1,
+    ...                        range(1000), 0, operator.add, max_keys=4)
+    >>> sorted(counts)[:3]
+    [(0, 100), (1, 100), (2, 100)]
+    """
+    if max_keys is None:
+        return _reduce_in_memory(key, reducer, iterable, init)
+    elif combiner is None:
+        raise ValueError("reduce_by_key needs a combiner to spill keys")
+    return _reduce_spilling(key, reducer, iterable, init, combiner,
+                            max_keys, partitions)
+
+
+_NO_ACC = object()
+
+
+def _reduce_chunk(key, reducer, iterable, init):
+    accs = {}
+    for x in iterable:
+        k = key(x)
+        acc = accs.get(k, _NO_ACC)
+        if acc is _NO_ACC:
+            acc = copy.copy(init)
+        accs[k] = reducer(acc, x)
+    return accs
+
+
+def _reduce_in_memory(key, reducer, iterable, init):
+    for item in _reduce_chunk(key, reducer, iterable, init).items():
+        yield item
+
+
+def _reduce_spilling(key, reducer, iterable, init, combiner, max_keys,
+                     partitions):
+    from collections import OrderedDict
+
+    # popping and reinserting keeps the accumulators in the order they
+    # were last updated, coldest first
+    accs = OrderedDict()
+    files = [None] * partitions
+    for x in iterable:
+        k = key(x)
+        acc = accs.pop(k, _NO_ACC)
+        if acc is _NO_ACC:
+            acc = copy.copy(init)
+        accs[k] = reducer(acc, x)
+        if len(accs) > max_keys:
+            spilled = [[] for _ in moves.range(partitions)]
+            for _ in moves.range(len(accs) // 2):
+                pair = accs.popitem(last=False)
+                spilled[hash(pair[0]) % partitions].append(pair)
+            for i, pairs in enumerate(spilled):
+                if pairs:
+                    files[i] = _spill(pairs, files[i])
+
+    for f in files:
+        if f is None:
+            continue
+        part = {}
+        for k, acc in _unspill(f):
+            part[k] = combiner(part[k], acc) if k in part else acc
+        for k, acc in part.items():
+            if k in accs:
+                acc = combiner(acc, accs.pop(k))
+            yield k, acc
+    for item in accs.items():
+        yield item
+
+
+def par_reduce_by_key(key, reducer, iterable, init, combiner,
+                      chunksize=4096, executor=None):
+    """..function::par_reduce_by_key(key, reducer, iterable, init, combiner)
+
+Like :func:`reduce_by_key` but reduces chunks of `chunksize` (4096)
+items on a `concurrent.futures` `executor`, a process pool by
+default, and merges the chunk results with `combiner`.  `key`,
+`reducer` and `combiner` must be picklable to run in a process pool.
+
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> with ThreadPoolExecutor(2) as executor:
+    ...     sums = par_reduce_by_key(even, operator.add, range(10), 0,
+    ...                              operator.add, 3, executor)
+    >>> sorted(sums)
+    [(False, 25), (True, 20)]
+    """
+    accs = {}
+    task = p(_reduce_chunk, key, reducer, init=init)
+    for chunk_accs in _par_map_chunks(task, iterable, chunksize, executor):
+        for k, acc in chunk_accs.items():
+            accs[k] = combiner(accs[k], acc) if k in accs else acc
+    return iter(accs.items())
+
+
 ####
 ## Predicates
 ####
@@ -326,7 +1088,7 @@ def even(x):
     True
 
     """
-    return operator.mod(x, 2) == 0
+    return x % 2 == 0
 
 
 def odd(x):
@@ -339,4 +1101,16 @@ def odd(x):
     >>> odd(2)
     False
     """
-    return operator.mod(x, 2) != 0
+    return x % 2 != 0
+
+
+# even and odd are written with operators so they already work on
+# whole numpy arrays, as do the arithmetic and comparison operators
+for _f in (even, odd,
+           operator.add, operator.sub, operator.mul, operator.truediv,
+           operator.floordiv, operator.mod, operator.pow,
+           operator.and_, operator.or_, operator.xor,
+           operator.lt, operator.le, operator.eq,
+           operator.ne, operator.ge, operator.gt):
+    register_vectorized(_f, _f)
+del _f
@@ -0,0 +1,244 @@
+"""
+Asynchronous counterparts of the iterator tools in :mod:`fp`.
+
+Every function accepts async iterables and plain iterables.  Passing
+`prefetch=n` reads up to `n` items ahead of the consumer in a
+background task, so downstream work overlaps with upstream I/O.
+
+:func:`afrom_sync` runs a sync iterator pipeline in a worker thread and
+feeds its items to the event loop.
+
+This module requires Python 3.7 or later.
+"""
+import asyncio
+import threading
+from fp import ichunk
+
+_ITEM = 0
+_END = 1
+_ERROR = 2
+
+
+async def _from_iterable(iterable):
+    for x in iterable:
+        yield x
+
+
+def _aiter(iterable):
+    if hasattr(iterable, "__aiter__"):
+        return iterable.__aiter__()
+    return _from_iterable(iterable).__aiter__()
+
+
+def _source(iterable, prefetch):
+    if prefetch:
+        return aprefetch(prefetch, iterable)
+    return _aiter(iterable)
+
+
+async def alist(iterable):
+    """
+    Collects the items of an async iterable into a list
+
+    >>> asyncio.run(alist(aitake(2, range(5))))
+    [0, 1]
+    """
+    return [x async for x in _aiter(iterable)]
+
+
+async def aprefetch(n, iterable):
+    """..function::aprefetch(n, iterable)
+
+Yields the items of `iterable`, reading up to `n` items ahead in a
+background task.  Errors from the source are raised to the consumer
+and the task is cancelled when the consumer stops early.
+
+    >>> async def slow():
+    ...     for i in range(3):
+    ...         await asyncio.sleep(0.01)
+    ...         yield i
+    >>> asyncio.run(alist(aprefetch(2, slow())))
+    [0, 1, 2]
+    """
+    queue = asyncio.Queue(n)
+    source = _aiter(iterable)
+
+    async def produce():
+        try:
+            async for x in source:
+                await queue.put((_ITEM, x))
+            await queue.put((_END, None))
+        except Exception as e:
+            await queue.put((_ERROR, e))
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            kind, x = await queue.get()
+            if kind == _ITEM:
+                yield x
+            elif kind == _END:
+                return
+            else:
+                raise x
+    finally:
+        task.cancel()
+
+
+async def aitake(n, iterable, prefetch=0):
+    """..function::aitake(n, iterable[, prefetch=0])
+
+Takes n items off the async iterable
+
+    >>> asyncio.run(alist(aitake(3, range(5))))
+    [0, 1, 2]
+
+    >>> asyncio.run(alist(aitake(3, [])))
+    []
+    """
+    if n <= 0:
+        return
+    i = 0
+    async for x in _source(iterable, prefetch):
+        yield x
+        i += 1
+        if i >= n:
+            return
+
+
+async def aidrop(n, iterable, prefetch=0):
+    """..function::aidrop(n, iterable[, prefetch=0])
+
+Drops the first `n` items off the async iterable
+
+    >>> asyncio.run(alist(aidrop(3, range(6))))
+    [3, 4, 5]
+    """
+    iterator = _source(iterable, prefetch)
+    i = 0
+    async for x in iterator:
+        i += 1
+        if i > n:
+            yield x
+            break
+    async for x in iterator:
+        yield x
+
+
+def asplitat(i, iterable, prefetch=0):
+    """..function::asplitat(i, iterable[, prefetch=0])
+
+returns two async iterators split at index `i`; the first must be
+consumed before the second
+
+    >>> async def split():
+    ...     head, tail = asplitat(2, range(5))
+    ...     return await alist(head), await alist(tail)
+    >>> asyncio.run(split())
+    ([0, 1], [2, 3, 4])
+    """
+    iterator = _source(iterable, prefetch)
+    return _ahead(i, iterator), iterator
+
+
+async def _ahead(n, iterator):
+    # unlike aitake this uses __anext__ so the shared iterator is not
+    # closed once the head is taken
+    for _ in range(n):
+        try:
+            x = await iterator.__anext__()
+        except StopAsyncIteration:
+            return
+        yield x
+
+
+async def azipwith(f, iterable1, iterable2, prefetch=0):
+    """..function::azipwith(f, iterable1, iterable2[, prefetch=0])
+
+Zips a function with two async iterables.  The next items of both
+iterables are awaited concurrently, and `f` may be a coroutine
+function.
+
+    >>> asyncio.run(alist(azipwith(lambda x, y: (x, y), [1, 2], [3, 4])))
+    [(1, 3), (2, 4)]
+    """
+    it1 = _source(iterable1, prefetch)
+    it2 = _source(iterable2, prefetch)
+    is_async = asyncio.iscoroutinefunction(f)
+    while True:
+        try:
+            x, y = await asyncio.gather(it1.__anext__(), it2.__anext__())
+        except StopAsyncIteration:
+            return
+        if is_async:
+            yield await f(x, y)
+        else:
+            yield f(x, y)
+
+
+async def acoalesce(items, prefetch=0):
+    """..function::acoalesce(items[, prefetch=0])
+
+Removes None values from an async iterator
+
+    >>> asyncio.run(alist(acoalesce([None, 1, None, 2])))
+    [1, 2]
+    """
+    async for x in _source(items, prefetch):
+        if x is not None:
+            yield x
+
+
+async def afrom_sync(iterable, maxsize=64, chunksize=1):
+    """..function::afrom_sync(iterable[, maxsize=64][, chunksize=1])
+
+Iterates a sync iterable in a worker thread, yielding its items to the
+event loop.  At most `maxsize` chunks of `chunksize` items are
+buffered; the worker blocks when the buffer is full and stops once the
+consumer stops.  Larger chunks cost fewer thread hand-offs but hold
+items back until a chunk is full.
+
+Blocking generator pipelines can then run alongside async code:
+
+    >>> import fp
+    >>> def numbers():
+    ...     return fp.coalesce(fp.itake(4, [1, None, 2, 3, 4]))
+    >>> asyncio.run(alist(afrom_sync(numbers())))
+    [1, 2, 3]
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def work():
+        try:
+            for chunk in ichunk(chunksize, iterable):
+                if stop.is_set():
+                    return
+                put((_ITEM, chunk))
+            put((_END, None))
+        except Exception as e:
+            if not stop.is_set():
+                put((_ERROR, e))
+
+    worker = threading.Thread(target=work)
+    worker.daemon = True
+    worker.start()
+    try:
+        while True:
+            kind, x = await queue.get()
+            if kind == _ITEM:
+                for item in x:
+                    yield item
+            elif kind == _END:
+                return
+            else:
+                raise x
+    finally:
+        stop.set()
+        # free a slot so a worker blocked on a full queue can finish
+        while not queue.empty():
+            queue.get_nowait()
@@ -2,7 +2,12 @@
 The fp.collections module provides utilities for working with collections.
 """
 
-from fp import trampoline
+import copy
+from fp import trampoline, const
+from fp.collections.pvector import PVector, TransientVector, pvector
+from fp.collections.pmap import PMap, TransientMap, pmap
+from fp.collections.jsonstream import each, query_json, get_nested_json
+from fp.collections.joins import ijoin_hash, ijoin_merge
 
 
 def lookup(monad_cls, collection, key):
@@ -26,7 +31,22 @@ def lookup(monad_cls, collection, key):
     Right(3)
     >>> lookup(Either, [1, 2, 3], 4)
     Left(IndexError('list index out of range',))
+
+    Misses on dicts, lists and tuples fail without raising an exception
     """
+    kind = type(collection)
+    if kind is dict:
+        try:
+            if key in collection:
+                return monad_cls.ret(collection[key])
+            return monad_cls.fail_error(KeyError, key)
+        except TypeError:
+            pass
+    elif (kind is list or kind is tuple) and type(key) is int:
+        if -len(collection) <= key < len(collection):
+            return monad_cls.ret(collection[key])
+        return monad_cls.fail_error(
+            IndexError, "{0} index out of range".format(kind.__name__))
     return monad_cls.catch(lambda: collection[key])
 
 
@@ -83,3 +103,178 @@ def __get_nested(monad_cls, accM, keys):
                 keys
                 )
             )
+
+
+# marks the function to apply at the end of a path in a path trie
+_LEAF = object()
+
+
+def _dissoc_leaf(_):
+    """
+    The update function of dissoc_in, handled by _update_paths
+    """
+
+
+def _thaw(collection):
+    if hasattr(collection, "transient"):
+        return collection.transient()
+    return copy.copy(collection)
+
+
+def _freeze(collection):
+    if hasattr(collection, "persistent"):
+        return collection.persistent()
+    return collection
+
+
+def _path_trie(updates):
+    trie = {}
+    for path, f in updates.items():
+        node = trie
+        for key in path:
+            node = node.setdefault(key, {})
+        node[_LEAF] = f
+    return trie
+
+
+def _update_paths(collection, trie, create):
+    children = [(k, sub) for k, sub in trie.items() if k is not _LEAF]
+    if children:
+        # copy this container once for every path that goes through it
+        new = _thaw(collection)
+        for key, sub in children:
+            if sub.get(_LEAF) is _dissoc_leaf:
+                collection[key]
+                if hasattr(new, "dissoc"):
+                    new.dissoc(key)
+                elif hasattr(new, "__delitem__"):
+                    del new[key]
+                else:
+                    raise TypeError("cannot remove {0!r} from a {1}".format(
+                        key, type(collection).__name__))
+                continue
+
+            try:
+                child = collection[key]
+            except KeyError:
+                if not create:
+                    raise
+                child = {}
+            child = _update_paths(child, sub, create)
+
+            if hasattr(new, "assoc"):
+                new.assoc(key, child)
+            else:
+                new[key] = child
+        collection = _freeze(new)
+
+    f = trie.get(_LEAF)
+    if f is not None:
+        collection = f(collection)
+    return collection
+
+
+def _maybe_catch(monad_cls, f, *args):
+    if monad_cls is None:
+        return f(*args)
+    return monad_cls.catch(f, *args)
+
+
+def update_many(collection, updates, monad_cls=None):
+    """
+    Applies functions to many values inside a nested data structure.
+
+    `updates` maps paths, as tuples of keys, to the function to call
+    with the value at that path.  Only the containers along the paths
+    are copied, each once no matter how many paths go through it;
+    everything else is shared with `collection`.
+
+    >>> data = {'a': {'b': 1, 'c': 2}, 'd': [1, 2]}
+    >>> new = update_many(data, {
+    ...     ('a', 'b'): lambda x: x + 1,
+    ...     ('a', 'c'): lambda x: x * 10,
+    ... })
+    >>> new == {'a': {'b': 2, 'c': 20}, 'd': [1, 2]}
+    True
+    >>> new['d'] is data['d']
+    True
+
+    Invalid paths raise like a lookup would, unless a monad class is
+    given:
+
+    >>> from fp.monads.maybe import Maybe
+    >>> update_many(data, {('x', 'y'): str}, monad_cls=Maybe)
+    Nothing
+    """
+    return _maybe_catch(
+        monad_cls, _update_paths, collection, _path_trie(updates), False)
+
+
+def update_in(collection, keys, f, monad_cls=None):
+    """
+    Returns a copy of `collection` with the value at the path `keys`
+    replaced by `f(value)`
+
+    >>> update_in({'foo': [1, 2]}, ['foo', 1], lambda x: x * 2)
+    {'foo': [1, 4]}
+
+    >>> from fp.monads.maybe import Maybe
+    >>> update_in({'foo': [1, 2]}, ['foo', 5], str, Maybe)
+    Nothing
+    """
+    return update_many(collection, {tuple(keys): f}, monad_cls)
+
+
+def assoc_in(collection, keys, value, monad_cls=None):
+    """
+    Returns a copy of `collection` with the value at the path `keys`
+    set to `value`.  Missing dict keys along the path are created.
+
+    >>> data = {'foo': {'bar': 1}, 'baz': {}}
+    >>> new = assoc_in(data, ['foo', 'bing', 'bong'], 2)
+    >>> new == {'foo': {'bar': 1, 'bing': {'bong': 2}}, 'baz': {}}
+    True
+    >>> new['baz'] is data['baz']
+    True
+    >>> data
+    {'foo': {'bar': 1}, 'baz': {}}
+
+    >>> from fp.monads.either import Either
+    >>> assoc_in([0, 1], [3], 'x', Either).is_left()
+    True
+    """
+    return _maybe_catch(
+        monad_cls, _update_paths, collection,
+        _path_trie({tuple(keys): const(value)}), True)
+
+
+def dissoc_in(collection, keys, monad_cls=None):
+    """
+    Returns a copy of `collection` without the value at the path `keys`
+
+    >>> dissoc_in({'foo': {'bar': 1, 'baz': 2}}, ['foo', 'bar'])
+    {'foo': {'baz': 2}}
+
+    >>> from fp.monads.maybe import Maybe
+    >>> dissoc_in({'foo': {}}, ['foo', 'bar'], Maybe)
+    Nothing
+
+    Persistent vectors have no removal, so removing from one raises:
+
+    >>> from fp.collections.pvector import pvector
+    >>> dissoc_in({'a': pvector([1, 2])}, ['a', 0])
+    Traceback (most recent call last):
+        ...
+    TypeError: cannot remove 0 from a PVector
+
+    The path must name something to remove:
+
+    >>> dissoc_in({'a': 1}, [])
+    Traceback (most recent call last):
+        ...
+    ValueError: dissoc_in needs a non-empty path
+    """
+    keys = tuple(keys)
+    if not keys:
+        raise ValueError("dissoc_in needs a non-empty path")
+    return update_many(collection, {keys: _dissoc_leaf}, monad_cls)
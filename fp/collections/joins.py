@@ -0,0 +1,237 @@
+"""
+Joins between iterators of records.
+
+Both joins pair each left record with the right records of equal key.
+Key functions may return plain values or a Maybe, such as
+:func:`fp.collections.get` returns; Just keys are unwrapped and records
+whose key is None or Nothing match nothing.
+
+`how` selects the records kept without a match, as in SQL:
+
+- "inner" yields `(left, right)` pairs of matching records only
+- "left" also keeps unmatched left records, yielding
+  `(left, Maybe right)` pairs
+- "right" also keeps unmatched right records, yielding
+  `(Maybe left, right)` pairs
+- "outer" keeps both, yielding `(Maybe left, Maybe right)` pairs
+"""
+import itertools
+from collections import deque
+from operator import itemgetter
+from fp.monads.maybe import Maybe, Just, Nothing
+
+_NO_KEY = object()
+
+# (keep unmatched left records, keep unmatched right records)
+_HOW = {
+    "inner": (False, False),
+    "left": (True, False),
+    "right": (False, True),
+    "outer": (True, True),
+}
+
+
+def _join_key(k):
+    if isinstance(k, Maybe):
+        return k.default(_NO_KEY)
+    return _NO_KEY if k is None else k
+
+
+def _identity(x):
+    return x
+
+
+def _wrappers(how):
+    try:
+        keep_left, keep_right = _HOW[how]
+    except KeyError:
+        raise ValueError(
+            "how must be one of 'inner', 'left', 'right' or 'outer'")
+    # a side is wrapped in a Maybe when it may be missing
+    wrap_left = Just if keep_right else _identity
+    wrap_right = Just if keep_left else _identity
+    return keep_left, keep_right, wrap_left, wrap_right
+
+
+def _build(rows, key):
+    table = {}
+    unkeyed = []
+    for row in rows:
+        k = _join_key(key(row))
+        if k is _NO_KEY:
+            unkeyed.append(row)
+        else:
+            matches = table.get(k)
+            if matches is None:
+                table[k] = [row]
+            else:
+                matches.append(row)
+    return table, unkeyed
+
+
+def ijoin_hash(left, right, left_key, right_key, how="inner"):
+    """..function::ijoin_hash(left, right, left_key, right_key[, how="inner"])
+
+Joins two iterables of records by building a hash table of one side
+and streaming the other.  The right side is built unless both sides
+have a length and the left one is shorter, so pass the smaller side,
+such as a dimension table, as `right` when streaming.
+
+    >>> from fp.monads.maybe import Maybe
+    >>> from fp.collections import get
+    >>> from fp import p
+    >>> events = [{'user': 1, 'e': 'a'}, {'user': 2, 'e': 'b'}, {'e': 'c'}]
+    >>> users = [{'id': 1, 'name': 'ann'}]
+    >>> for e, u in ijoin_hash(events, users, p(get, Maybe, 'user'),
+    ...                        p(get, Maybe, 'id'), how="left"):
+    ...     print(e['e'], u.default({}).get('name'))
+    a ann
+    b None
+    c None
+    """
+    keep_left, keep_right, wrap_left, wrap_right = _wrappers(how)
+    if (hasattr(left, "__len__") and hasattr(right, "__len__") and
+            len(left) < len(right)):
+        return _hash_join_left_built(left, right, left_key, right_key,
+                                     keep_left, keep_right,
+                                     wrap_left, wrap_right)
+    return _hash_join(left, right, left_key, right_key,
+                      keep_left, keep_right, wrap_left, wrap_right)
+
+
+def _hash_join(left, right, left_key, right_key, keep_left, keep_right,
+               wrap_left, wrap_right):
+    table, unkeyed = _build(right, right_key)
+    matched = set() if keep_right else None
+    for lrow in left:
+        k = _join_key(left_key(lrow))
+        matches = table.get(k) if k is not _NO_KEY else None
+        if matches:
+            wl = wrap_left(lrow)
+            for r in matches:
+                yield wl, wrap_right(r)
+            if keep_right:
+                matched.add(k)
+        elif keep_left:
+            yield wrap_left(lrow), Nothing
+
+    if keep_right:
+        for k, rows in table.items():
+            if k not in matched:
+                for r in rows:
+                    yield Nothing, wrap_right(r)
+        for r in unkeyed:
+            yield Nothing, wrap_right(r)
+
+
+def _hash_join_left_built(left, right, left_key, right_key, keep_left,
+                          keep_right, wrap_left, wrap_right):
+    table, unkeyed = _build(left, left_key)
+    matched = set() if keep_left else None
+    for r in right:
+        k = _join_key(right_key(r))
+        matches = table.get(k) if k is not _NO_KEY else None
+        if matches:
+            wr = wrap_right(r)
+            for lrow in matches:
+                yield wrap_left(lrow), wr
+            if keep_left:
+                matched.add(k)
+        elif keep_right:
+            yield Nothing, wrap_right(r)
+
+    if keep_left:
+        for k, rows in table.items():
+            if k not in matched:
+                for lrow in rows:
+                    yield wrap_left(lrow), Nothing
+        for lrow in unkeyed:
+            yield wrap_left(lrow), Nothing
+
+
+def ijoin_merge(left, right, left_key, right_key, how="inner"):
+    """..function::ijoin_merge(left, right, left_key, right_key[, how="inner"])
+
+Joins two iterables of records already sorted by key.  Only the right
+records sharing the current key are held in memory, so the inputs may
+be arbitrarily long.  Records without a key may appear anywhere.
+
+    >>> left = [(1, 'a'), (2, 'b'), (2, 'c'), (4, 'd')]
+    >>> right = [(1, 'x'), (2, 'y'), (3, 'z')]
+    >>> first = lambda row: row[0]
+    >>> for l, r in ijoin_merge(left, right, first, first, how="outer"):
+    ...     print(l.default(None), r.default(None))
+    (1, 'a') (1, 'x')
+    (2, 'b') (2, 'y')
+    (2, 'c') (2, 'y')
+    None (3, 'z')
+    (4, 'd') None
+
+A right record without a key does not split the records around it:
+
+    >>> right = [(1, 'x'), (None, 'n'), (1, 'y')]
+    >>> for l, r in ijoin_merge([(1, 'a')], right, first, first, "right"):
+    ...     print(l.default(None), r)
+    None (None, 'n')
+    (1, 'a') (1, 'x')
+    (1, 'a') (1, 'y')
+    """
+    keep_left, keep_right, wrap_left, wrap_right = _wrappers(how)
+    # keyless right records are set aside so they do not split a run of
+    # equal keys; they are flushed as unmatched each time a group is read
+    keyless = deque()
+
+    def keyed():
+        for r in right:
+            k = _join_key(right_key(r))
+            if k is not _NO_KEY:
+                yield k, r
+            elif keep_right:
+                keyless.append(r)
+
+    groups = itertools.groupby(keyed(), itemgetter(0))
+
+    def next_group():
+        for k, pairs in groups:
+            return k, [r for _, r in pairs]
+        return None, None
+
+    def flush_keyless():
+        while keyless:
+            yield Nothing, wrap_right(keyless.popleft())
+
+    rk, rows = next_group()
+    matched = False
+    for lrow in left:
+        for pair in flush_keyless():
+            yield pair
+        lk = _join_key(left_key(lrow))
+        if lk is _NO_KEY:
+            if keep_left:
+                yield wrap_left(lrow), Nothing
+            continue
+
+        while rows is not None and rk < lk:
+            if keep_right and not matched:
+                for r in rows:
+                    yield Nothing, wrap_right(r)
+            rk, rows = next_group()
+            matched = False
+
+        if rows is not None and rk == lk:
+            matched = True
+            wl = wrap_left(lrow)
+            for r in rows:
+                yield wl, wrap_right(r)
+        elif keep_left:
+            yield wrap_left(lrow), Nothing
+
+    if keep_right:
+        while rows is not None:
+            if not matched:
+                for r in rows:
+                    yield Nothing, wrap_right(r)
+            rk, rows = next_group()
+            matched = False
+        for pair in flush_keyless():
+            yield pair
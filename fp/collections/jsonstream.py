@@ -0,0 +1,368 @@
+"""
+Streaming nested-path queries over JSON documents.
+
+The document is scanned without being parsed into Python objects; only
+the values at the requested paths are decoded and every other subtree
+is skipped by scanning for its closing bracket.
+"""
+import json
+import mmap
+import re
+from fp import atom
+
+# a path segment matching every key of an object or item of an array
+each = atom("each", __name__)
+
+_WS = re.compile(br"[ \t\n\r]*")
+_STRING = re.compile(br'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# skips text and strings up to the next bracket, which is either an
+# array of scalars (group 1), an opening bracket (group 2) or a closing
+# bracket
+_TOKEN = re.compile(
+    br'(?:[^"\[\]{}]|"[^"\\]*(?:\\.[^"\\]*)*")*'
+    br'(?:(\[[^"\[\]{}]*\])|([\[{])|[\]}])', re.S)
+_SCALAR_END = re.compile(br"[,\]}\s]")
+
+
+class _Node(object):
+    """
+    A node of the query trie.  `paths` are the paths going through the
+    node and `ends` the paths that end at it.
+    """
+    __slots__ = ("children", "ends", "paths")
+
+    def __init__(self):
+        self.children = {}
+        self.ends = []
+        self.paths = []
+
+
+def _query_trie(paths):
+    root = _Node()
+    for path in paths:
+        node = root
+        node.paths.append(path)
+        for key in path:
+            node = node.children.setdefault(key, _Node())
+            node.paths.append(path)
+        node.ends.append(path)
+    return root
+
+
+def _ws(buf, pos):
+    return _WS.match(buf, pos).end()
+
+
+def _skip_to_close(buf, pos, depth):
+    """
+    Returns the position after the bracket closing a container that is
+    `depth` levels deep at `pos`.
+
+    Each token is matched where the previous one ended, so truncated
+    documents fail in a single linear scan:
+
+    >>> _skip_to_close(b'"a]" [1, {"b": 2}]]', 0, 1)
+    19
+    >>> _skip_to_close(b' ' * 100000 + b', "unterminated', 0, 1)
+    Traceback (most recent call last):
+        ...
+    ValueError: Unterminated JSON container
+    """
+    match = _TOKEN.match
+    while True:
+        m = match(buf, pos)
+        if m is None:
+            raise ValueError("Unterminated JSON container")
+        pos = m.end()
+        opened = m.lastindex
+        if opened == 2:
+            depth += 1
+        elif opened is None:
+            depth -= 1
+            if not depth:
+                return pos
+
+
+def _skip(buf, pos):
+    ch = buf[pos:pos + 1]
+    if ch == b'"':
+        return _STRING.match(buf, pos).end()
+    elif ch in (b"{", b"["):
+        return _skip_to_close(buf, pos + 1, 1)
+    m = _SCALAR_END.search(buf, pos)
+    return len(buf) if m is None else m.start()
+
+
+def _decode(raw):
+    return json.loads(bytes(raw).decode("utf-8"))
+
+
+class _Done(Exception):
+    """
+    Raised to stop scanning once every path is resolved
+    """
+
+
+class _Scanner(object):
+    def __init__(self, buf, paths):
+        self.buf = buf
+        self.found = {}
+        self.errors = {}
+        # paths with a wildcard can only be resolved by a full scan
+        if any(each in path for path in paths):
+            self.pending = None
+        else:
+            self.pending = set(paths)
+
+    def _resolve(self, path):
+        if self.pending is not None:
+            self.pending.discard(path)
+            if not self.pending:
+                raise _Done()
+
+    def _record(self, path, value):
+        if each in path:
+            self.found.setdefault(path, []).append(value)
+        else:
+            self.found[path] = value
+            self._resolve(path)
+
+    def _miss(self, child, error):
+        for path in child.paths:
+            if path not in self.errors:
+                self.errors[path] = error
+                self._resolve(path)
+
+    def value(self, pos, states):
+        buf = self.buf
+        pos = _ws(buf, pos)
+        start = pos
+        ch = buf[pos:pos + 1]
+        branches = [s for s in states if s.children]
+
+        if not branches:
+            end = _skip(buf, pos)
+        elif ch == b"{":
+            end = self.object(pos + 1, branches)
+        elif ch == b"[":
+            end = self.array(pos + 1, branches)
+        else:
+            # strings can be indexed, so scalars are looked up in Python
+            end = _skip(buf, pos)
+            self.lookup(_decode(buf[start:end]), branches)
+
+        ends = [path for s in states for path in s.ends]
+        if ends:
+            value = _decode(buf[start:end])
+            for path in ends:
+                self._record(path, value)
+        return end
+
+    def lookup(self, value, states):
+        for s in states:
+            for key, child in s.children.items():
+                if key is each:
+                    if isinstance(value, dict):
+                        items = value.values()
+                    elif isinstance(value, list):
+                        items = value
+                    else:
+                        items = ()
+                else:
+                    try:
+                        items = [value[key]]
+                    except Exception as err:
+                        self._miss(child, err)
+                        continue
+
+                for item in items:
+                    for path in child.ends:
+                        self._record(path, item)
+                    if child.children:
+                        self.lookup(item, [child])
+
+    def object(self, pos, states):
+        buf = self.buf
+        wanted = set(k for s in states for k in s.children)
+        wildcard = each in wanted
+        seen = set()
+
+        pos, done = _open(buf, pos, b"}")
+        while not done:
+            m = _STRING.match(buf, pos)
+            if m is None:
+                raise ValueError(
+                    "Expecting property name at byte {0}".format(pos))
+            raw = m.group()
+            key = (raw[1:-1].decode("utf-8") if b"\\" not in raw
+                   else _decode(raw))
+            pos = _ws(buf, m.end())
+            if buf[pos:pos + 1] != b":":
+                raise ValueError(
+                    "Expecting ':' delimiter at byte {0}".format(pos))
+
+            sub = [s.children[k] for s in states
+                   for k in (key, each) if k in s.children]
+            pos = self.value(pos + 1, sub)
+            seen.add(key)
+
+            if not wildcard and wanted <= seen:
+                # everything wanted is found, skip the rest of the object
+                return _skip_to_close(buf, pos, 1)
+            pos, done = _next(buf, pos, b"}")
+
+        for s in states:
+            for key, child in s.children.items():
+                if key is not each and key not in seen:
+                    self._miss(child, KeyError(key))
+        return pos
+
+    def array(self, pos, states):
+        buf = self.buf
+        index = 0
+        for s in states:
+            for key, child in s.children.items():
+                if key is not each and not isinstance(key, int):
+                    self._miss(child, TypeError(
+                        "list indices must be integers"))
+
+        wanted = set(k for s in states for k in s.children)
+        indexes = [k for k in wanted if isinstance(k, int)]
+        if indexes and min(indexes) < 0:
+            # negative indexes need the length, decode the whole array
+            end = _skip_to_close(buf, pos, 1)
+            self.lookup(_decode(buf[pos - 1:end]), states)
+            return end
+        elif each in wanted:
+            last = None
+        elif indexes:
+            last = max(indexes)
+        else:
+            return _skip_to_close(buf, pos, 1)
+
+        pos, done = _open(buf, pos, b"]")
+        while not done:
+            sub = [s.children[k] for s in states
+                   for k in (index, each) if k in s.children]
+            pos = self.value(pos, sub)
+            if index == last:
+                # everything wanted is found, skip the rest of the array
+                return _skip_to_close(buf, pos, 1)
+            index += 1
+            pos, done = _next(buf, pos, b"]")
+
+        for s in states:
+            for key, child in s.children.items():
+                if isinstance(key, int) and not 0 <= key < index:
+                    self._miss(child, IndexError("list index out of range"))
+        return pos
+
+
+def _open(buf, pos, close):
+    """
+    Returns the position of the first member of a container and
+    whether the container is empty
+    """
+    pos = _ws(buf, pos)
+    if buf[pos:pos + 1] == close:
+        return pos + 1, True
+    return pos, False
+
+
+def _next(buf, pos, close):
+    """
+    Returns the position of the next member of a container and whether
+    the end of the container was reached
+    """
+    pos = _ws(buf, pos)
+    ch = buf[pos:pos + 1]
+    if ch == b",":
+        return _ws(buf, pos + 1), False
+    elif ch == close:
+        return pos + 1, True
+    raise ValueError("Expecting ',' delimiter at byte {0}".format(pos))
+
+
+def _as_buffer(source):
+    if isinstance(source, (bytes, bytearray, mmap.mmap)):
+        return source
+    elif isinstance(source, memoryview):
+        return source.tobytes()
+    elif hasattr(source, "read"):
+        try:
+            return mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, IOError, OSError, ValueError):
+            return source.read()
+    else:
+        return source.encode("utf-8")
+
+
+def query_json(monad_cls, source, paths):
+    """
+    Looks up many paths in a JSON document in a single scan.
+
+    `source` is a bytes object, an mmap, a file or a string.  Returns a
+    dict mapping each path, as a tuple, to the same result
+    :func:`fp.collections.get_nested` would give for the parsed
+    document, as long as the objects on the paths have no duplicate
+    keys.
+
+    >>> from fp.monads.maybe import Maybe
+    >>> doc = b'{"a": {"b": [10, 20]}, "c": "skipped", "d": true}'
+    >>> results = query_json(Maybe, doc, [('a', 'b', 1), ('d',), ('x',)])
+    >>> results[('a', 'b', 1)], results[('d',)], results[('x',)]
+    (Just(20), Just(True), Nothing)
+
+    The :data:`each` segment matches every item of an array or value of
+    an object and collects the matches into a list:
+
+    >>> doc = b'{"rows": [{"id": 1}, {"id": 2}, {"name": "x"}]}'
+    >>> query_json(Maybe, doc, [('rows', each, 'id')])
+    {('rows', each, 'id'): Just([1, 2])}
+
+    The scan stops at the first occurrence of a wanted key, so where an
+    object repeats a key the first value is found, unlike
+    :func:`json.loads`, which keeps the last:
+
+    >>> query_json(Maybe, b'{"a": 1, "a": 2}', [('a',)])
+    {('a',): Just(1)}
+    """
+    paths = [tuple(path) for path in paths]
+    buf = _as_buffer(source)
+    scanner = _Scanner(buf, paths)
+    try:
+        scanner.value(0, [_query_trie(paths)])
+    except _Done:
+        pass
+
+    results = {}
+    for path in paths:
+        if path in scanner.found:
+            results[path] = monad_cls.ret(scanner.found[path])
+        elif each in path:
+            results[path] = monad_cls.ret([])
+        else:
+            results[path] = monad_cls.fail(
+                scanner.errors.get(path, KeyError(path)))
+    return results
+
+
+def get_nested_json(monad_cls, source, *keys):
+    """
+    Get a value deep inside a JSON document without parsing all of it
+
+    >>> from fp.monads.maybe import Maybe
+    >>> get_nested_json(Maybe, b'{"foo": [{"bar": "baz"}]}', 'foo', 0, 'bar')
+    Just('baz')
+    >>> get_nested_json(Maybe, b'{"foo": [{"bar": "baz"}]}', 'foo', 1)
+    Nothing
+
+Truncated documents raise ValueError:
+
+    >>> get_nested_json(Maybe, b'{"x": {"y": ' + b' ' * 100000 +
+    ...                 b', "z": "unterminated', 'q')
+    Traceback (most recent call last):
+        ...
+    ValueError: Unterminated JSON container
+    """
+    return query_json(monad_cls, source, [keys])[keys]
@@ -0,0 +1,364 @@
+"""
+A persistent hash map implemented as a hash array mapped trie (HAMT),
+after Clojure's PersistentHashMap.
+
+Each node holds up to 32 entries indexed by 5 bits of the key's hash.
+Updates copy only the nodes on the path to the changed key.
+"""
+from fp.missing_six import Mapping
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+
+
+def _hash(key):
+    return hash(key) & 0xFFFFFFFF
+
+
+def _bitpos(h, shift):
+    return 1 << ((h >> shift) & _MASK)
+
+
+def _index(bitmap, bit):
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+class _Edit(object):
+    """
+    Marks the nodes owned by a transient; they may be changed in place
+    """
+    __slots__ = ()
+
+
+# entries are either (hash, key, value) leaves or child nodes
+
+class _BitmapNode(object):
+    __slots__ = ("edit", "bitmap", "array")
+
+    def __init__(self, edit, bitmap, array):
+        self.edit = edit
+        self.bitmap = bitmap
+        self.array = array
+
+    def _editable(self, edit):
+        if edit is not None and self.edit is edit:
+            return self
+        return _BitmapNode(edit, self.bitmap, list(self.array))
+
+    def find(self, shift, h, key, default):
+        bit = _bitpos(h, shift)
+        if not self.bitmap & bit:
+            return default
+        entry = self.array[_index(self.bitmap, bit)]
+        if type(entry) is tuple:
+            if entry[1] is key or entry[1] == key:
+                return entry[2]
+            return default
+        return entry.find(shift + _BITS, h, key, default)
+
+    def assoc(self, edit, shift, h, key, value, added):
+        bit = _bitpos(h, shift)
+        idx = _index(self.bitmap, bit)
+        if not self.bitmap & bit:
+            node = self._editable(edit)
+            node.array.insert(idx, (h, key, value))
+            node.bitmap |= bit
+            added[0] = True
+            return node
+
+        entry = self.array[idx]
+        if type(entry) is tuple:
+            if entry[1] is key or entry[1] == key:
+                if entry[2] is value:
+                    return self
+                new = (h, key, value)
+            else:
+                new = _make_node(edit, shift + _BITS, entry, (h, key, value))
+                added[0] = True
+        else:
+            new = entry.assoc(edit, shift + _BITS, h, key, value, added)
+            if new is entry:
+                return self
+
+        node = self._editable(edit)
+        node.array[idx] = new
+        return node
+
+    def without(self, edit, shift, h, key, removed):
+        bit = _bitpos(h, shift)
+        if not self.bitmap & bit:
+            return self
+        idx = _index(self.bitmap, bit)
+        entry = self.array[idx]
+
+        if type(entry) is tuple:
+            if not (entry[1] is key or entry[1] == key):
+                return self
+            removed[0] = True
+            child = None
+        else:
+            child = entry.without(edit, shift + _BITS, h, key, removed)
+            if child is entry:
+                return self
+
+        if child is None:
+            if self.bitmap == bit:
+                return None
+            node = self._editable(edit)
+            del node.array[idx]
+            node.bitmap ^= bit
+            return node
+
+        # pull a lone leaf up into this node
+        if (type(child) is _BitmapNode and len(child.array) == 1 and
+                type(child.array[0]) is tuple):
+            child = child.array[0]
+        node = self._editable(edit)
+        node.array[idx] = child
+        return node
+
+    def entries(self):
+        for entry in self.array:
+            if type(entry) is tuple:
+                yield entry
+            else:
+                for leaf in entry.entries():
+                    yield leaf
+
+
+class _CollisionNode(object):
+    """
+    Holds the leaves of keys whose hashes are equal
+    """
+    __slots__ = ("edit", "hash", "array")
+
+    def __init__(self, edit, h, array):
+        self.edit = edit
+        self.hash = h
+        self.array = array
+
+    def _editable(self, edit):
+        if edit is not None and self.edit is edit:
+            return self
+        return _CollisionNode(edit, self.hash, list(self.array))
+
+    def _find_index(self, key):
+        for i, entry in enumerate(self.array):
+            if entry[1] is key or entry[1] == key:
+                return i
+        return -1
+
+    def find(self, shift, h, key, default):
+        i = self._find_index(key)
+        return default if i == -1 else self.array[i][2]
+
+    def assoc(self, edit, shift, h, key, value, added):
+        if h != self.hash:
+            node = _BitmapNode(edit, _bitpos(self.hash, shift), [self])
+            return node.assoc(edit, shift, h, key, value, added)
+
+        i = self._find_index(key)
+        if i != -1 and self.array[i][2] is value:
+            return self
+        node = self._editable(edit)
+        if i == -1:
+            node.array.append((h, key, value))
+            added[0] = True
+        else:
+            node.array[i] = (h, key, value)
+        return node
+
+    def without(self, edit, shift, h, key, removed):
+        i = self._find_index(key)
+        if i == -1:
+            return self
+        removed[0] = True
+        if len(self.array) == 2:
+            leaf = self.array[1 - i]
+            return _BitmapNode(edit, _bitpos(leaf[0], shift), [leaf])
+        node = self._editable(edit)
+        del node.array[i]
+        return node
+
+    def entries(self):
+        return iter(self.array)
+
+
+def _make_node(edit, shift, leaf1, leaf2):
+    if leaf1[0] == leaf2[0]:
+        return _CollisionNode(edit, leaf1[0], [leaf1, leaf2])
+    # the new node is private until returned so it may be built in place
+    owner = edit if edit is not None else _Edit()
+    added = [False]
+    node = _BitmapNode(owner, 0, [])
+    node = node.assoc(owner, shift, leaf1[0], leaf1[1], leaf1[2], added)
+    return node.assoc(owner, shift, leaf2[0], leaf2[1], leaf2[2], added)
+
+
+_MISSING = object()
+
+
+class PMap(Mapping):
+    """
+    A persistent hash map; use :func:`pmap` to create one.
+
+    >>> m1 = pmap({'a': 1})
+    >>> m2 = m1.assoc('b', 2)
+    >>> sorted(m2.items())
+    [('a', 1), ('b', 2)]
+
+    The original map is unchanged:
+
+    >>> m1
+    pmap({'a': 1})
+
+    Lookups raise KeyError like a dict so it works with
+    :func:`fp.collections.get_nested`:
+
+    >>> from fp.monads.maybe import Maybe
+    >>> from fp.collections import get_nested
+    >>> get_nested(Maybe, pmap({'a': pmap({'b': 1})}), 'a', 'b')
+    Just(1)
+    >>> get_nested(Maybe, m2, 'c')
+    Nothing
+    """
+    __slots__ = ("_count", "_root")
+
+    def __init__(self, count, root):
+        self._count = count
+        self._root = root
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        value = self._root.find(0, _hash(key), key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        return self._root.find(0, _hash(key), key, default)
+
+    def __contains__(self, key):
+        return self._root.find(0, _hash(key), key, _MISSING) is not _MISSING
+
+    def __iter__(self):
+        for leaf in self._root.entries():
+            yield leaf[1]
+
+    def items(self):
+        return ((leaf[1], leaf[2]) for leaf in self._root.entries())
+
+    def values(self):
+        return (leaf[2] for leaf in self._root.entries())
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "pmap({0!r})".format(dict(self.items()))
+
+    def assoc(self, key, value):
+        """
+        Returns a new map with `key` set to `value`
+
+        >>> pmap().assoc('a', 1)
+        pmap({'a': 1})
+        """
+        added = [False]
+        root = self._root.assoc(None, 0, _hash(key), key, value, added)
+        if root is self._root:
+            return self
+        return PMap(self._count + added[0], root)
+
+    def dissoc(self, key):
+        """
+        Returns a new map without `key`
+
+        >>> pmap({'a': 1, 'b': 2}).dissoc('a')
+        pmap({'b': 2})
+
+        >>> pmap({'a': 1}).dissoc('b')
+        pmap({'a': 1})
+        """
+        removed = [False]
+        root = self._root.without(None, 0, _hash(key), key, removed)
+        if not removed[0]:
+            return self
+        if root is None:
+            return _EMPTY
+        return PMap(self._count - 1, root)
+
+    def transient(self):
+        """
+        Returns a mutable :class:`TransientMap` for batching updates
+
+        >>> t = pmap().transient()
+        >>> for i in range(3):
+        ...     t.assoc(i, i * i)
+        >>> t.persistent()
+        pmap({0: 0, 1: 1, 2: 4})
+        """
+        return TransientMap(self)
+
+
+class TransientMap(object):
+    """
+    A mutable builder for :class:`PMap`.  Nodes created by the
+    transient are changed in place instead of being copied.
+    """
+    __slots__ = ("_edit", "_count", "_root")
+
+    def __init__(self, base):
+        self._edit = _Edit()
+        self._count = base._count
+        self._root = base._root
+
+    def __len__(self):
+        return self._count
+
+    def _ensure_editable(self):
+        if self._edit is None:
+            raise ValueError("transient used after persistent() call")
+
+    def assoc(self, key, value):
+        self._ensure_editable()
+        added = [False]
+        self._root = self._root.assoc(
+            self._edit, 0, _hash(key), key, value, added)
+        self._count += added[0]
+
+    def dissoc(self, key):
+        self._ensure_editable()
+        removed = [False]
+        root = self._root.without(self._edit, 0, _hash(key), key, removed)
+        self._count -= removed[0]
+        self._root = root if root is not None else _EMPTY._root
+
+    def persistent(self):
+        """
+        Returns the built map; the transient must not be used after
+        """
+        self._ensure_editable()
+        self._edit = None
+        return PMap(self._count, self._root)
+
+
+_EMPTY = PMap(0, _BitmapNode(None, 0, []))
+
+
+def pmap(mapping=(), **kwargs):
+    """..function::pmap([mapping][, **kwargs]) -> PMap
+
+Creates a persistent map like :class:`dict` does
+
+    >>> pmap({'a': 1}, b=2) == {'a': 1, 'b': 2}
+    True
+    """
+    items = mapping.items() if hasattr(mapping, "items") else mapping
+    t = _EMPTY.transient()
+    for key, value in items:
+        t.assoc(key, value)
+    for key, value in kwargs.items():
+        t.assoc(key, value)
+    return t.persistent()
@@ -0,0 +1,272 @@
+"""
+A persistent vector implemented as a 32-way trie with a tail, after
+Clojure's PersistentVector.
+
+Updates copy only the O(log32 n) nodes on the path to the changed
+element and share the rest with the original vector.
+"""
+from fp.missing_six import Sequence
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+def _new_path(level, node):
+    while level > 0:
+        node = [node]
+        level -= _BITS
+    return node
+
+
+def _build_tree(leaves):
+    """
+    Builds a left-packed tree out of full leaves, returning (shift, root)
+    """
+    shift = _BITS
+    nodes = leaves
+    while len(nodes) > _WIDTH:
+        nodes = [nodes[i:i + _WIDTH] for i in range(0, len(nodes), _WIDTH)]
+        shift += _BITS
+    return shift, nodes
+
+
+class PVector(Sequence):
+    """
+    A persistent vector; use :func:`pvector` to create one.
+
+    >>> v1 = pvector([1, 2, 3])
+    >>> v2 = v1.conj(4).assoc(0, 'a')
+    >>> v2
+    pvector(['a', 2, 3, 4])
+
+    The original vector is unchanged:
+
+    >>> v1
+    pvector([1, 2, 3])
+
+    Lookups raise IndexError like a list so it works with
+    :func:`fp.collections.lookup`:
+
+    >>> from fp.monads.maybe import Maybe
+    >>> from fp.collections import lookup
+    >>> lookup(Maybe, v2, 3)
+    Just(4)
+    >>> lookup(Maybe, v2, 4)
+    Nothing
+    """
+    __slots__ = ("_count", "_shift", "_root", "_tail")
+
+    def __init__(self, count, shift, root, tail):
+        self._count = count
+        self._shift = shift
+        self._root = root
+        self._tail = tail
+
+    @classmethod
+    def _from_list(cls, items):
+        count = len(items)
+        if count == 0:
+            return _EMPTY
+        tailoff = ((count - 1) >> _BITS) << _BITS
+        leaves = [items[i:i + _WIDTH] for i in range(0, tailoff, _WIDTH)]
+        shift, root = _build_tree(leaves)
+        return cls(count, shift, root, items[tailoff:])
+
+    def _tailoff(self):
+        if self._count < _WIDTH:
+            return 0
+        return ((self._count - 1) >> _BITS) << _BITS
+
+    def _leaf_for(self, i):
+        if i >= self._tailoff():
+            return self._tail
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(i >> level) & _MASK]
+            level -= _BITS
+        return node
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return PVector._from_list(
+                [self[j] for j in range(*i.indices(self._count))])
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("pvector index out of range")
+        return self._leaf_for(i)[i & _MASK]
+
+    def __iter__(self):
+        for i in range(0, self._count, _WIDTH):
+            for x in self._leaf_for(i):
+                yield x
+
+    def __eq__(self, other):
+        if not isinstance(other, (PVector, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            x == y for x, y in zip(self, other))
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "pvector({0!r})".format(list(self))
+
+    def conj(self, x):
+        """
+        Returns a new vector with `x` appended
+
+        >>> pvector().conj(1).conj(2)
+        pvector([1, 2])
+        """
+        count = self._count
+        if count - self._tailoff() < _WIDTH:
+            return PVector(count + 1, self._shift, self._root,
+                           self._tail + [x])
+
+        # the tail is full, push it into the tree
+        shift = self._shift
+        if (count >> _BITS) > (1 << shift):
+            root = [self._root, _new_path(shift, self._tail)]
+            shift += _BITS
+        else:
+            root = self._push_tail(shift, self._root, self._tail)
+        return PVector(count + 1, shift, root, [x])
+
+    def _push_tail(self, level, parent, tail):
+        subidx = ((self._count - 1) >> level) & _MASK
+        node = list(parent)
+        if level == _BITS:
+            insert = tail
+        elif subidx < len(parent):
+            insert = self._push_tail(level - _BITS, parent[subidx], tail)
+        else:
+            insert = _new_path(level - _BITS, tail)
+
+        if subidx < len(node):
+            node[subidx] = insert
+        else:
+            node.append(insert)
+        return node
+
+    def assoc(self, i, x):
+        """
+        Returns a new vector with index `i` set to `x`.  Setting the
+        index one past the end appends `x`.
+
+        >>> pvector([1, 2]).assoc(1, 'b')
+        pvector([1, 'b'])
+
+        >>> pvector([1, 2]).assoc(2, 3)
+        pvector([1, 2, 3])
+
+        >>> pvector([1, 2]).assoc(3, 3)
+        Traceback (most recent call last):
+            ...
+        IndexError: pvector index out of range
+        """
+        if i < 0:
+            i += self._count
+        if i == self._count:
+            return self.conj(x)
+        if not 0 <= i < self._count:
+            raise IndexError("pvector index out of range")
+
+        if i >= self._tailoff():
+            tail = list(self._tail)
+            tail[i & _MASK] = x
+            return PVector(self._count, self._shift, self._root, tail)
+        return PVector(self._count, self._shift,
+                       _do_assoc(self._shift, self._root, i, x), self._tail)
+
+    def transient(self):
+        """
+        Returns a mutable :class:`TransientVector` for batching updates
+
+        >>> t = pvector().transient()
+        >>> for i in range(5):
+        ...     t.conj(i)
+        >>> t.persistent()
+        pvector([0, 1, 2, 3, 4])
+        """
+        return TransientVector(self)
+
+
+def _do_assoc(level, node, i, x):
+    node = list(node)
+    if level == 0:
+        node[i & _MASK] = x
+    else:
+        subidx = (i >> level) & _MASK
+        node[subidx] = _do_assoc(level - _BITS, node[subidx], i, x)
+    return node
+
+
+class TransientVector(object):
+    """
+    A mutable builder for :class:`PVector`.  Appended items are kept
+    in a list and the trie is built in one pass by :meth:`persistent`.
+    """
+    __slots__ = ("_base", "_extra")
+
+    def __init__(self, base):
+        self._base = base
+        self._extra = []
+
+    def __len__(self):
+        return len(self._base) + len(self._extra)
+
+    def conj(self, x):
+        self._extra.append(x)
+
+    def assoc(self, i, x):
+        n = len(self._base)
+        if i < 0:
+            i += len(self)
+        if i < n:
+            self._base = self._base.assoc(i, x)
+        elif i == len(self):
+            self._extra.append(x)
+        else:
+            self._extra[i - n] = x
+
+    def persistent(self):
+        """
+        Returns the built vector; the transient must not be used after
+        """
+        base, extra = self._base, self._extra
+        self._base = self._extra = None
+        if not extra:
+            return base
+        elif len(extra) < len(base):
+            for x in extra:
+                base = base.conj(x)
+            return base
+        else:
+            return PVector._from_list(list(base) + extra)
+
+
+_EMPTY = PVector(0, _BITS, [], [])
+
+
+def pvector(iterable=()):
+    """..function::pvector([iterable]) -> PVector
+
+Creates a persistent vector from the items of `iterable`
+
+    >>> pvector(range(3))
+    pvector([0, 1, 2])
+
+    >>> len(pvector(range(10000)))
+    10000
+    """
+    return PVector._from_list(list(iterable))
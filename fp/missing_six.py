@@ -1,6 +1,11 @@
 import itertools
 import six
 
+try:
+    from collections.abc import Mapping, Sequence
+except ImportError:  # pragma: no cover
+    from collections import Mapping, Sequence
+
 if six.PY3:
     ifilter = filter
 else:
@@ -0,0 +1,169 @@
+"""
+A compact binary framing for streams of Maybe and Either results.
+
+Each result is a header byte holding its kind and the type of its
+payload, followed by the payload.  Ints, floats, strings, bytes, bools
+and None are packed with :mod:`struct`; anything else is pickled.
+
+    >>> from fp.monads.maybe import Just, Nothing
+    >>> from fp.monads.either import Left, Right
+    >>> data = encode_results([Just(1), Nothing, Right(u"ok"), Left(2.5)])
+    >>> len(data)
+    26
+    >>> decode_results(data)
+    [Just(1), Nothing, Right('ok'), Left(2.5)]
+"""
+import pickle
+import struct
+import six
+from fp.monads.maybe import Maybe, Nothing
+from fp.monads.either import Left, Right
+
+# result kinds, the high nibble of the header
+_NOTHING = 0x00
+_JUST = 0x10
+_LEFT = 0x20
+_RIGHT = 0x30
+
+# payload types, the low nibble of the header
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT = 3
+_FLOAT = 4
+_TEXT = 5
+_BYTES = 6
+_PICKLE = 7
+
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+
+_INT_MIN = -(1 << 63)
+_INT_MAX = (1 << 63) - 1
+
+_KINDS = {_JUST: Maybe, _LEFT: Left, _RIGHT: Right}
+
+
+def _write_payload(out, kind, value):
+    t = type(value)
+    if value is None:
+        out.append(kind | _NONE)
+    elif t is bool:
+        out.append(kind | (_TRUE if value else _FALSE))
+    elif t in six.integer_types and _INT_MIN <= value <= _INT_MAX:
+        out.append(kind | _INT)
+        out += _INT64.pack(value)
+    elif t is float:
+        out.append(kind | _FLOAT)
+        out += _FLOAT64.pack(value)
+    elif t is six.text_type:
+        raw = value.encode("utf-8")
+        out.append(kind | _TEXT)
+        out += _LENGTH.pack(len(raw))
+        out += raw
+    elif t is bytes:
+        out.append(kind | _BYTES)
+        out += _LENGTH.pack(len(value))
+        out += value
+    else:
+        raw = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        out.append(kind | _PICKLE)
+        out += _LENGTH.pack(len(raw))
+        out += raw
+
+
+def encode_result(out, result):
+    """
+    Appends the encoding of a Maybe or Either to the bytearray `out`
+    """
+    if isinstance(result, Maybe):
+        if result.is_nothing:
+            out.append(_NOTHING)
+        else:
+            _write_payload(out, _JUST, result.from_just)
+    elif isinstance(result, Left):
+        _write_payload(out, _LEFT, result.either(_first, None))
+    elif isinstance(result, Right):
+        _write_payload(out, _RIGHT, result.default(None))
+    else:
+        raise TypeError(
+            "cannot encode {0!r}, expected a Maybe or an Either".format(
+                result))
+
+
+def _first(x):
+    return x
+
+
+def encode_results(results):
+    """
+    Encodes an iterable of Maybe and Either results into one bytes
+    object
+    """
+    out = bytearray()
+    for result in results:
+        encode_result(out, result)
+    return bytes(out)
+
+
+def idecode_results(buf):
+    """
+    Yields the results encoded in `buf`, a bytes-like object, without
+    copying it
+    """
+    buf = memoryview(buf)
+    if buf.ndim != 1 or buf.itemsize != 1:
+        buf = buf.cast("B")
+    unpack_int = _INT64.unpack_from
+    unpack_float = _FLOAT64.unpack_from
+    unpack_length = _LENGTH.unpack_from
+    kinds = _KINDS
+    end = len(buf)
+    pos = 0
+    while pos < end:
+        header = buf[pos]
+        pos += 1
+        kind = header & 0xF0
+        if kind == _NOTHING:
+            yield Nothing
+            continue
+
+        t = header & 0x0F
+        if t == _NONE:
+            value = None
+        elif t == _TRUE:
+            value = True
+        elif t == _FALSE:
+            value = False
+        elif t == _INT:
+            value = unpack_int(buf, pos)[0]
+            pos += 8
+        elif t == _FLOAT:
+            value = unpack_float(buf, pos)[0]
+            pos += 8
+        else:
+            n = unpack_length(buf, pos)[0]
+            pos += 4
+            raw = buf[pos:pos + n]
+            pos += n
+            if t == _TEXT:
+                value = raw.tobytes().decode("utf-8")
+            elif t == _BYTES:
+                value = raw.tobytes()
+            elif t == _PICKLE:
+                value = pickle.loads(raw.tobytes())
+            else:
+                raise ValueError("unknown payload type {0}".format(t))
+
+        cls = kinds.get(kind)
+        if cls is None:
+            raise ValueError("unknown result kind {0:#x}".format(kind))
+        yield cls(value)
+
+
+def decode_results(buf):
+    """
+    Decodes every result encoded in `buf` into a list
+    """
+    return list(idecode_results(buf))
@@ -1,5 +1,5 @@
 import fp
-from fp.monads.monad import Monad
+from fp.monads.monad import Monad, _gen_return
 from abc import ABCMeta, abstractmethod
 
 
@@ -77,6 +77,49 @@ class Either(Monad):
     def fail(cls, exception):
         return Left(exception)
 
+    @classmethod
+    def run_arrows(cls, arrows, x):
+        """
+        Runs the arrows, stopping at the first Left
+
+        >>> Either.run_arrows([Right, Left, Right], 1)
+        Left(1)
+        """
+        arrows = iter(arrows)
+        m = next(arrows)(x)
+        for arrow in arrows:
+            if isinstance(m, Left):
+                return m
+            m = m.bind(arrow)
+        return m
+
+    @classmethod
+    def run_do(cls, make_gen):
+        """
+        Drives a :func:`fp.monads.monad.do` block, stopping at the first
+        Left
+
+        >>> from fp.monads.monad import do
+        >>> @do(Either)
+        ... def divide(x, y):
+        ...     if y == 0:
+        ...         yield Left("divide by zero")
+        ...     return x // y
+        >>> divide(4, 2), divide(4, 0)
+        (Right(2), Left('divide by zero'))
+        """
+        gen = make_gen()
+        x = None
+        while True:
+            try:
+                m = gen.send(x)
+            except StopIteration as stop:
+                return cls.ret(_gen_return(stop))
+            if isinstance(m, Left):
+                gen.close()
+                return m
+            x = m.default(None)
+
     @abstractmethod
     def either(self, left_fun, right_fun):
         """
@@ -129,6 +172,19 @@ class Left(Either):
     def bind(self, _):
         return self
 
+    def short_circuits(self):
+        return True
+
+    def __reduce__(self):
+        """
+        Pickles a Left as its error
+
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(Left("bad")))
+        Left('bad')
+        """
+        return Left, (self.__error,)
+
     def either(self, left_fun, _):
         return left_fun(self.__error)
 
@@ -158,6 +214,9 @@ class Right(Either):
     def bind(self, f):
         return f(self.__value)
 
+    def __reduce__(self):
+        return Right, (self.__value,)
+
     def either(self, _, right_fun):
         return right_fun(self.__value)
 
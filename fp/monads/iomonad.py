@@ -1,7 +1,9 @@
 """
 """
 
-from fp.monads.monad import Monad
+import time
+from types import GeneratorType
+from fp.monads.monad import Monad, _gen_return
 from functools import wraps
 
 
@@ -69,11 +71,17 @@ class IO(Monad):
         return IO(lambda: value)
 
     def bind(self, f):
-        def new_action():
-            x = self.run()
-            ioM = f(x)
-            return ioM.run()
-        return IO(new_action)
+        """
+        Binds are run by a loop rather than nested calls, so long chains
+        do not grow the stack:
+
+        >>> action = IO.ret(0)
+        >>> for _ in range(100000):
+        ...     action = action.bind(lambda n: IO.ret(n + 1))
+        >>> action.run()
+        100000
+        """
+        return _Bind(self, f)
 
     @classmethod
     def fail(cls, exception):
@@ -87,5 +95,143 @@ class IO(Monad):
         """
         raise exception
 
+    @classmethod
+    def run_do(cls, make_gen):
+        """
+        Returns an IO action that runs a :func:`fp.monads.monad.do`
+        block, running each yielded action in turn.  Nothing runs until
+        the action is run.
+
+        >>> from fp.monads.monad import do
+        >>> @do(IO)
+        ... def greet():
+        ...     name = yield IO.ret("World")
+        ...     yield printLn("Hello")
+        ...     yield printLn(name)
+        ...     return name
+        >>> action = greet()
+        >>> action.run()
+        Hello
+        World
+        'World'
+        """
+        return _Do(make_gen)
+
+    @classmethod
+    def capture(cls, err, policy=None):
+        """
+        IO fails by raising, so errors are kept whole
+        """
+        return err
+
+    @classmethod
+    def fail_error(cls, exc_type, *args):
+        """
+        Raises an error of `exc_type`, whatever the capture policy
+
+        >>> IO.fail_error(KeyError, 'foo')
+        Traceback (most recent call last):
+            ...
+        KeyError: 'foo'
+        """
+        return cls.fail(exc_type(*args))
+
     def run(self):
-        return self.__action()
+        return _interpret(self, [], None, None)
+
+    def run_for(self, max_steps=None, deadline=None):
+        """
+        Runs the action for at most `max_steps` steps, or until
+        `time.time()` passes `deadline`, whichever comes first.  Each
+        action run and each bind is a step.
+
+        Returns the result if the action finished, otherwise a
+        :class:`Suspended` action that continues from where this one
+        stopped.  This lets long computations share a thread or an
+        event loop by running a slice at a time:
+
+        >>> count = IO.ret(0)
+        >>> for _ in range(10):
+        ...     count = count.bind(lambda n: IO.ret(n + 1))
+        >>> result = count.run_for(5)
+        >>> slices = 1
+        >>> while isinstance(result, Suspended):
+        ...     result = result.run_for(5)
+        ...     slices += 1
+        >>> result, slices
+        (10, 5)
+        """
+        return _interpret(self, [], max_steps, deadline)
+
+
+class _Bind(IO):
+    __slots__ = ("m", "f")
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+
+class _Do(IO):
+    __slots__ = ("make_gen",)
+
+    def __init__(self, make_gen):
+        self.make_gen = make_gen
+
+
+class Suspended(IO):
+    """
+    The rest of an action stopped by :meth:`IO.run_for`.  Running it
+    continues the action; it can be run only once.
+    """
+    __slots__ = ("m", "stack")
+
+    def __init__(self, m, stack):
+        self.m = m
+        self.stack = stack
+
+
+def _interpret(m, stack, max_steps, deadline):
+    """
+    Runs the action `m` then the continuations on `stack`, innermost
+    last.  A continuation is a bind's function or a do block's
+    generator.
+    """
+    steps = 0
+    while True:
+        if max_steps is not None and steps >= max_steps or (
+                deadline is not None and time.time() >= deadline):
+            return Suspended(m, stack)
+        steps += 1
+
+        kind = type(m)
+        if kind is _Bind:
+            stack.append(m.f)
+            m = m.m
+            continue
+        elif kind is _Do:
+            stack.append(m.make_gen())
+            value = None
+        elif kind is Suspended:
+            stack.extend(m.stack)
+            m = m.m
+            continue
+        else:
+            value = m._IO__action()
+
+        # resume the innermost continuation with the value
+        while stack:
+            frame = stack[-1]
+            if type(frame) is GeneratorType:
+                try:
+                    m = frame.send(value)
+                except StopIteration as stop:
+                    stack.pop()
+                    value = _gen_return(stop)
+                    continue
+            else:
+                stack.pop()
+                m = frame(value)
+            break
+        else:
+            return value
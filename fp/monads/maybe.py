@@ -1,4 +1,4 @@
-from fp.monads.monad import Monad, MonadPlus
+from fp.monads.monad import Monad, MonadPlus, _gen_return
 
 
 class Maybe(Monad, MonadPlus):
@@ -111,6 +111,37 @@ class Maybe(Monad, MonadPlus):
     def __eq__(self, other):
         return self.__value == other.__value
 
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((Maybe, self.__value))
+
+    def __lt__(self, other):
+        """
+        Nothing sorts before every Just, which sort by their values
+
+        >>> sorted([Just(2), Nothing, Just(1)])
+        [Nothing, Just(1), Just(2)]
+        """
+        if self.__value is None:
+            return other.__value is not None
+        return other.__value is not None and self.__value < other.__value
+
+    def __reduce__(self):
+        """
+        Pickles a Maybe as its value; Nothing keeps its identity
+
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(Nothing)) is Nothing
+        True
+        >>> pickle.loads(pickle.dumps(Just(1)))
+        Just(1)
+        """
+        if self.is_nothing:
+            return "Nothing"
+        return Maybe, (self.__value,)
+
     def __repr__(self):
         if self.is_just:
             return "Just({0!r})".format(self.__value)
@@ -233,6 +264,61 @@ class Maybe(Monad, MonadPlus):
         else:
             return self
 
+    @classmethod
+    def run_arrows(cls, arrows, x):
+        """
+        Runs the arrows unwrapping each Just directly instead of binding
+
+        >>> Maybe.run_arrows([Just, lambda x: Just(x + 1)], 1)
+        Just(2)
+        """
+        for arrow in arrows:
+            m = arrow(x)
+            x = m.__value
+            if x is None:
+                return m
+        return m
+
+    @classmethod
+    def run_do(cls, make_gen):
+        """
+        Drives a :func:`fp.monads.monad.do` block, sending Just values
+        back without binding and stopping at the first Nothing
+        """
+        gen = make_gen()
+        x = None
+        while True:
+            try:
+                m = gen.send(x)
+            except StopIteration as stop:
+                return cls.ret(_gen_return(stop))
+            x = m.__value
+            if x is None:
+                gen.close()
+                return m
+
+    def short_circuits(self):
+        """
+        >>> Nothing.short_circuits()
+        True
+        """
+        return self.is_nothing
+
+    @classmethod
+    def capture(cls, err, policy=None):
+        """
+        Nothing keeps no error, so none is captured
+        """
+        return None
+
+    @classmethod
+    def fail_error(cls, exc_type, *args):
+        """
+        >>> Maybe.fail_error(KeyError, 'foo')
+        Nothing
+        """
+        return Nothing
+
     @classmethod
     def fail(cls, err):
         """
@@ -244,6 +330,18 @@ class Maybe(Monad, MonadPlus):
     ##=====================================================================
     ## MonadPlus methods
     ##=====================================================================
+    left_biased = True
+
+    def is_mzero(self):
+        """
+        >>> Nothing.is_mzero()
+        True
+
+        >>> Just(1).is_mzero()
+        False
+        """
+        return self.is_nothing
+
     def mplus(self, y):
         """
         An associative operation.
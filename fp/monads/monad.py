@@ -5,12 +5,163 @@ Monads
 """
 
 from abc import ABCMeta, abstractmethod
+from functools import wraps
 from fp import atom
 from six import moves
 import six
 
 # atoms
-noop = atom("noop")
+noop = atom("noop", __name__)
+
+
+def do(monad_cls):
+    """
+    Decorates a generator function so it can be written in
+    do-notation: each yielded monad is bound and its value sent back
+    into the generator.  The value the generator returns is wrapped
+    with `monad_cls.ret`.
+
+    >>> from fp.monads.maybe import Maybe, Just, Nothing
+    >>> @do(Maybe)
+    ... def add(mx, my):
+    ...     x = yield mx
+    ...     y = yield my
+    ...     return x + y
+
+    >>> add(Just(1), Just(2))
+    Just(3)
+
+    >>> add(Just(1), Nothing)
+    Nothing
+
+    The generator is driven by a loop, so long blocks do not grow the
+    stack:
+
+    >>> @do(Maybe)
+    ... def count(n):
+    ...     total = 0
+    ...     for _ in range(n):
+    ...         total = yield Just(total + 1)
+    ...     return total
+    >>> count(10000)
+    Just(10000)
+    """
+    def decorator(f):
+        @wraps(f)
+        def inner(*args, **kwargs):
+            return monad_cls.run_do(lambda: f(*args, **kwargs))
+        return inner
+    return decorator
+
+
+def _cons_to_list(xs):
+    """
+    Converts a cons list of nested (head, tail) pairs ending in (),
+    built newest first, into a list in the order the items were consed
+    """
+    items = []
+    while xs:
+        x, xs = xs
+        items.append(x)
+    items.reverse()
+    return items
+
+
+class ErrorRecord(object):
+    """
+    A compact record of an exception's type and arguments, kept instead
+    of the exception by :func:`capture_record`
+
+    >>> ErrorRecord(KeyError, ('foo',))
+    ErrorRecord(KeyError, ('foo',))
+
+    >>> ErrorRecord(KeyError, ('foo',)).to_exception()
+    KeyError('foo')
+    """
+    __slots__ = ("type", "args")
+
+    def __init__(self, type, args):
+        self.type = type
+        self.args = args
+
+    def __eq__(self, other):
+        return (isinstance(other, ErrorRecord) and
+                self.type is other.type and self.args == other.args)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.type, self.args))
+
+    def __repr__(self):
+        return "ErrorRecord({0}, {1!r})".format(self.type.__name__, self.args)
+
+    def to_exception(self):
+        """
+        Rebuilds the exception, without a traceback
+        """
+        return self.type(*self.args)
+
+
+def capture_exception(err):
+    """
+    The default capture policy: keep the exception as it is, along with
+    its traceback and every frame the traceback references
+    """
+    return err
+
+
+def capture_without_traceback(err):
+    """
+    A capture policy that keeps the exception but drops its traceback
+    and the exceptions chained to it, releasing their frames
+    """
+    err.__traceback__ = None
+    err.__context__ = None
+    err.__cause__ = None
+    return err
+
+
+def capture_record(err):
+    """
+    A capture policy that only keeps the exception's type and arguments
+    """
+    return ErrorRecord(type(err), err.args)
+
+
+_capture_policy = capture_exception
+
+
+def set_capture_policy(policy):
+    """
+    Sets the capture policy :meth:`Monad.catch` applies to the errors it
+    passes to `fail`, returning the previous policy
+
+    >>> from fp.monads.either import Either
+    >>> previous = set_capture_policy(capture_record)
+    >>> Either.catch(lambda: {}['foo'])
+    Left(ErrorRecord(KeyError, ('foo',)))
+    >>> _ = set_capture_policy(previous)
+    """
+    global _capture_policy
+    previous = _capture_policy
+    _capture_policy = policy
+    return previous
+
+
+def get_capture_policy():
+    """
+    Returns the current capture policy
+    """
+    return _capture_policy
+
+
+def _gen_return(stop):
+    """
+    Returns the value a generator returned with
+    """
+    return getattr(stop, "value", None)
 
 
 class Monad(object):
@@ -54,17 +205,14 @@ class Monad(object):
         >>> Maybe.sequence([Just(1), Just(2)])
         Just([1, 2])
         """
-        ret = cls.ret([])
-
-        def append_and_return(xs, x):
-            xs.append(x)
-            return xs
-
+        # values are consed onto an immutable list, so a lazy monad
+        # starts from an empty result each time it is run
+        ret = cls.ret(())
         for m in ms:
+            # m is bound as a default so lazy monads see their own action
             ret = ret.bind(
-                lambda xs: m.bind(
-                    lambda x: cls.ret(append_and_return(xs, x))))
-        return ret
+                lambda xs, m=m: m.bind(lambda x: cls.ret((x, xs))))
+        return ret.map(_cons_to_list)
 
     @classmethod
     def sequence_(cls, ms):
@@ -95,17 +243,12 @@ class Monad(object):
                Just({'foo': 1, 'bar': 2})
         True
         """
-        ret = cls.ret({})
-
-        def store_and_return(d, k, v):
-            d[k] = v
-            return d
-
+        ret = cls.ret(())
         for k, m in six.iteritems(d):
             ret = ret.bind(
-                lambda d: m.bind(
-                    lambda v: cls.ret(store_and_return(d, k, v))))
-        return ret
+                lambda kvs, k=k, m=m: m.bind(
+                    lambda v: cls.ret(((k, v), kvs))))
+        return ret.map(lambda kvs: dict(_cons_to_list(kvs)))
 
     @classmethod
     def mapM(cls, arrow, items):
@@ -120,6 +263,16 @@ class Monad(object):
 
         >>> Maybe.mapM(maybe_int, ["1", "a"])
         Nothing
+
+        A lazy monad built by mapM can be run more than once:
+
+        >>> from fp.monads.state import State
+        >>> action = State.mapM(
+        ...     lambda x: State.gets(lambda s: x * s), [1, 2])
+        >>> action.eval_state(10)
+        [10, 20]
+        >>> action.eval_state(10)
+        [10, 20]
         """
         return cls.sequence(moves.map(arrow, items))
 
@@ -155,9 +308,92 @@ class Monad(object):
 
         >>> string_to_plus("a")
         Nothing
+
+        The composition is a flat :class:`Kleisli` pipeline so chains of
+        arrow_cl do not nest.
+        """
+
+        return cls.pipeline(arrow1, arrow2)
+
+    @classmethod
+    def pipeline(cls, *arrows):
+        """Left to Right composition of many arrows
+
+        >>> from fp.monads.maybe import Maybe, Just
+        >>> from fp import p
+        >>> maybe_int = p(Maybe.catch, int)
+        >>> incr = lambda x: Just(x + 1)
+        >>> parse_and_add_two = Maybe.pipeline(maybe_int, incr, incr)
+        >>> parse_and_add_two("1")
+        Just(3)
+
+        >>> parse_and_add_two("a")
+        Nothing
         """
+        return Kleisli(cls, arrows)
 
-        return lambda x: arrow1(x).bind(arrow2)
+    @classmethod
+    def run_arrows(cls, arrows, x):
+        """
+        Runs a non-empty sequence of arrows left to right in one loop,
+        stopping early once a result :meth:`short_circuits`.  Monads
+        may override this with a loop that skips `bind`.
+
+        >>> from fp.monads.iomonad import IO
+        >>> IO.run_arrows([IO.ret, lambda x: IO.ret(x * 2)], 2).run()
+        4
+        """
+        arrows = iter(arrows)
+        m = next(arrows)(x)
+        for arrow in arrows:
+            if m.short_circuits():
+                return m
+            m = m.bind(arrow)
+        return m
+
+    def short_circuits(self):
+        """
+        True if binding this monad never calls the arrow
+        """
+        return False
+
+    @classmethod
+    def run_do(cls, make_gen):
+        """
+        Runs the generator made by `make_gen` as a :func:`do` block.
+
+        This default binds each yielded monad to the next step of the
+        generator, which nests one call per step for monads whose bind
+        runs eagerly; monads override it with a loop.
+
+        The generator is made when the block starts, so a lazy monad
+        built from a do block can be run more than once:
+
+        >>> from fp.monads.state import State
+        >>> @do(State)
+        ... def incr():
+        ...     n = yield State.get()
+        ...     yield State.put(n + 1)
+        ...     return n
+        >>> action = incr()
+        >>> action.run(1)
+        (1, 2)
+        >>> action.run(10)
+        (10, 11)
+        """
+        def start(_):
+            gen = make_gen()
+
+            def step(x):
+                try:
+                    m = gen.send(x)
+                except StopIteration as stop:
+                    return cls.ret(_gen_return(stop))
+                return m.bind(step)
+
+            return step(None)
+
+        return cls.ret(None).bind(start)
 
     @classmethod
     def arrow_cr(cls, arrow1, arrow2):
@@ -317,7 +553,100 @@ class Monad(object):
         try:
             return cls.ret(f(*args, **kwargs))
         except Exception as e:
-            return cls.fail(e)
+            return cls.fail(cls.capture(e))
+
+    @classmethod
+    def catch_with(cls, policy, f, *args, **kwargs):
+        """
+        Like :meth:`catch` but captures errors with `policy` instead of
+        the global capture policy
+
+        >>> from fp.monads.either import Either
+        >>> Either.catch_with(capture_record, int, "x")
+        ... # doctest: +ELLIPSIS
+        Left(ErrorRecord(ValueError, ("invalid literal for int()...",)))
+
+        The error still goes through the monad's :meth:`capture`, so IO
+        raises it whole:
+
+        >>> from fp.monads.iomonad import IO
+        >>> IO.catch_with(capture_record, int, "x")
+        ... # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+            ...
+        ValueError: invalid literal for int()...
+        """
+        try:
+            return cls.ret(f(*args, **kwargs))
+        except Exception as e:
+            return cls.fail(cls.capture(e, policy))
+
+    @classmethod
+    def capture(cls, err, policy=None):
+        """
+        Turns an error caught by :meth:`catch` into the value passed to
+        `fail`, using `policy` or else the global capture policy
+        """
+        return (policy or _capture_policy)(err)
+
+    @classmethod
+    def fail_error(cls, exc_type, *args):
+        """
+        Fails with an error of `exc_type` without raising it.  The error
+        is captured like a caught one, and a :class:`ErrorRecord` policy
+        never builds the exception at all.
+
+        >>> from fp.monads.either import Either
+        >>> Either.fail_error(KeyError, 'foo')
+        Left(KeyError('foo'))
+        """
+        if _capture_policy is capture_record:
+            return cls.fail(ErrorRecord(exc_type, args))
+        return cls.fail(cls.capture(exc_type(*args)))
+
+
+class Kleisli(object):
+    """
+    A pipeline of monadic arrows, run left to right in a single loop.
+
+    The arrows are kept in a flat tuple; pipelines made of pipelines are
+    flattened, so long chains neither nest closures nor grow the stack.
+    Pipelines can be extended with `>>`:
+
+    >>> from fp.monads.maybe import Maybe, Just, Nothing
+    >>> incr = Maybe.pipeline(lambda x: Just(x + 1))
+    >>> positive = lambda x: Just(x) if x > 0 else Nothing
+    >>> (incr >> positive >> incr)(1)
+    Just(3)
+
+    >>> (incr >> positive >> incr)(-5)
+    Nothing
+
+    >>> len(Maybe.pipeline(*[incr] * 10000).arrows)
+    10000
+    """
+    __slots__ = ("monad_cls", "arrows")
+
+    def __init__(self, monad_cls, arrows):
+        flat = []
+        for arrow in arrows:
+            if isinstance(arrow, Kleisli):
+                flat.extend(arrow.arrows)
+            else:
+                flat.append(arrow)
+        self.monad_cls = monad_cls
+        self.arrows = tuple(flat)
+
+    def __call__(self, x):
+        if not self.arrows:
+            return self.monad_cls.ret(x)
+        return self.monad_cls.run_arrows(self.arrows, x)
+
+    def __rshift__(self, arrow):
+        return Kleisli(self.monad_cls, (self, arrow))
+
+    def __rrshift__(self, arrow):
+        return Kleisli(self.monad_cls, (arrow, self))
 
 
 class MonadPlus(object):
@@ -330,12 +659,22 @@ class MonadPlus(object):
 
     mzero = NotImplemented  # MonadPlus sub-classes need to define mzero
 
+    # True when x.mplus(y) is x for any x that is not mzero, which lets
+    # msum stop at the first non-zero value
+    left_biased = False
+
     @abstractmethod
     def mplus(self, y):
         """
         An associative operation
         """
 
+    def is_mzero(self):
+        """
+        True if this is the zero result
+        """
+        return self == self.mzero
+
     @classmethod
     def msum(cls, xs):
         """
@@ -351,12 +690,87 @@ class MonadPlus(object):
         >>> Maybe.msum([Nothing, Nothing, Nothing])
         Nothing
 
+        For left-biased instances the reduction stops at the first
+        non-zero value, so it works on infinite iterators:
+
+        >>> import itertools
+        >>> Maybe.msum(itertools.chain([Nothing, Just(1)],
+        ...                            itertools.repeat(Nothing)))
+        Just(1)
         """
+        if cls.left_biased:
+            for x in xs:
+                if not x.is_mzero():
+                    return x
+            return cls.mzero
+
         return moves.reduce(
             cls.mplus,
             xs,
             cls.mzero)
 
+    @classmethod
+    def msum_lazy(cls, thunks):
+        """
+        Like msum but takes functions that return the alternatives.
+        For left-biased instances each alternative is only computed if
+        the ones before it were zero:
+
+        >>> from fp.monads.maybe import Just, Nothing, Maybe
+        >>> def crashy():
+        ...     assert False, "msum_lazy will not call me"
+        >>> Maybe.msum_lazy([lambda: Nothing, lambda: Just(1), crashy])
+        Just(1)
+
+        >>> Maybe.msum_lazy([])
+        Nothing
+        """
+        return cls.msum(thunk() for thunk in thunks)
+
+    @classmethod
+    def par_msum(cls, thunks, executor=None):
+        """
+        Computes the alternatives concurrently and returns their msum.
+
+        For left-biased instances the result is the first non-zero
+        alternative in the order given, returned as soon as it and
+        every alternative before it are done; the alternatives not yet
+        started are cancelled.
+
+        A `concurrent.futures` executor may be passed in, otherwise a
+        thread pool is used for the call.
+
+        >>> import time
+        >>> from fp.monads.maybe import Just, Nothing, Maybe
+        >>> def slow():
+        ...     time.sleep(0.1)
+        ...     return Just('slow')
+        >>> Maybe.par_msum([slow, lambda: Just('fast')])
+        Just('slow')
+
+        >>> Maybe.par_msum([lambda: Nothing, lambda: Just(2)])
+        Just(2)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        thunks = list(thunks)
+        if not thunks:
+            return cls.mzero
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=len(thunks))
+
+        pending = []
+        try:
+            pending.extend(executor.submit(thunk) for thunk in thunks)
+            return cls.msum(future.result() for future in pending)
+        finally:
+            for future in pending:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(wait=False)
+
     def mfilter(self, pred):
         """
         Returns Monad.mzero if the pred is False.
@@ -0,0 +1,216 @@
+"""
+"""
+
+from fp.monads.monad import Monad, noop
+
+
+class State(Monad):
+    """
+    The State monad threads a state value through a computation.
+
+    >>> def counter(name):
+    ...     return State.modify(lambda counts: dict(
+    ...         counts, **{name: counts.get(name, 0) + 1}))
+
+    >>> State.mapM_(counter, ["a", "b", "a"]).exec_state({})
+    {'a': 2, 'b': 1}
+
+    Binds are not run as they are made; :meth:`run` interprets them in
+    a loop, so long chains do not grow the stack:
+
+    >>> incr = State.modify(lambda n: n + 1)
+    >>> State.sequence_([incr] * 100000).exec_state(0)
+    100000
+
+    Mutable state objects can be updated in place with
+    :meth:`modify_in_place`, which calls `f` for its side effect and
+    keeps the same state object:
+
+    >>> def tally(word):
+    ...     return State.modify_in_place(lambda c: c.append(word))
+    >>> State.mapM_(tally, ["x", "y"]).exec_state([])
+    ['x', 'y']
+    """
+
+    @classmethod
+    def ret(cls, value):
+        return _Pure(value)
+
+    @classmethod
+    def fail(cls, exception):
+        """
+        State cannot fail, the exception is raised
+
+        >>> State.fail(KeyError("key"))
+        Traceback (most recent call last):
+            ...
+        KeyError: 'key'
+        """
+        raise exception
+
+    @classmethod
+    def state(cls, f):
+        """
+        A stateful computation from a function of the state returning a
+        pair of a value and the new state
+
+        >>> State.state(lambda s: (s, s + 1)).run(1)
+        (1, 2)
+        """
+        return _Step(f)
+
+    @classmethod
+    def get(cls):
+        """
+        Returns the state
+
+        >>> State.get().run(1)
+        (1, 1)
+        """
+        return _GET
+
+    @classmethod
+    def gets(cls, f):
+        """
+        Returns `f` applied to the state
+
+        >>> State.gets(len).run("abc")
+        (3, 'abc')
+        """
+        return _Gets(f)
+
+    @classmethod
+    def put(cls, s):
+        """
+        Replaces the state
+
+        >>> State.put(2).run(1)
+        (noop, 2)
+        """
+        return _Put(s)
+
+    @classmethod
+    def modify(cls, f):
+        """
+        Replaces the state with `f(state)`
+
+        >>> State.modify(lambda s: s * 2).run(2)
+        (noop, 4)
+        """
+        return _Modify(f)
+
+    @classmethod
+    def modify_in_place(cls, f):
+        """
+        Calls `f(state)` to update a mutable state in place; the state
+        object itself is kept
+
+        >>> State.modify_in_place(lambda d: d.update(a=1)).run({})
+        (noop, {'a': 1})
+        """
+        return _ModifyInPlace(f)
+
+    def bind(self, f):
+        return _Bind(self, f)
+
+    def run(self, s):
+        """
+        Runs the computation from the state `s`, returning the pair of
+        its value and the final state
+        """
+        stack = []
+        m = self
+
+        while True:
+            kind = type(m)
+            if kind is _Bind:
+                stack.append(m.f)
+                m = m.m
+                continue
+            elif kind is _Pure:
+                value = m.value
+            elif kind is _Gets:
+                value = m.f(s)
+            elif kind is _Modify:
+                s = m.f(s)
+                value = noop
+            elif kind is _ModifyInPlace:
+                m.f(s)
+                value = noop
+            elif kind is _Put:
+                s = m.s
+                value = noop
+            elif kind is _Get:
+                value = s
+            else:
+                value, s = m.f(s)
+
+            if not stack:
+                return value, s
+            m = stack.pop()(value)
+
+    def eval_state(self, s):
+        """
+        Runs the computation, returning its value
+
+        >>> State.gets(len).eval_state("abc")
+        3
+        """
+        return self.run(s)[0]
+
+    def exec_state(self, s):
+        """
+        Runs the computation, returning the final state
+
+        >>> State.put(2).exec_state(1)
+        2
+        """
+        return self.run(s)[1]
+
+
+class _Pure(State):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Step(State):
+    __slots__ = ("f",)
+
+    def __init__(self, f):
+        self.f = f
+
+
+class _Get(State):
+    __slots__ = ()
+
+
+class _Gets(_Step):
+    __slots__ = ()
+
+
+class _Put(State):
+    __slots__ = ("s",)
+
+    def __init__(self, s):
+        self.s = s
+
+
+class _Modify(_Step):
+    __slots__ = ()
+
+
+class _ModifyInPlace(_Step):
+    __slots__ = ()
+
+
+class _Bind(State):
+    __slots__ = ("m", "f")
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+
+_GET = _Get()
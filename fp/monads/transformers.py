@@ -0,0 +1,233 @@
+"""
+IO actions that may fail with Maybe or Either semantics.
+"""
+from types import GeneratorType
+from fp.monads.monad import Monad, _gen_return
+from fp.monads.maybe import Maybe
+from fp.monads.either import Either
+
+# node tags
+_PURE = 0
+_FAIL = 1
+_LIFT = 2
+_FROM = 3
+_CATCH = 4
+_BIND = 5
+_DO = 6
+
+# the default of a failed result when it is unwrapped
+_STOP = object()
+
+
+class _ResultIO(Monad):
+    """
+    An IO action whose result is a `_result_cls` value.
+
+    Every action is a flat node of a tag and two operands; :meth:`run`
+    interprets the nodes in one loop, unwrapping each result in place
+    instead of binding an IO and then the result inside it.
+    """
+    __slots__ = ("_tag", "_a", "_b")
+
+    _result_cls = None
+
+    def __init__(self, tag, a, b=None):
+        self._tag = tag
+        self._a = a
+        self._b = b
+
+    @classmethod
+    def ret(cls, value):
+        return cls(_PURE, value)
+
+    @classmethod
+    def fail(cls, error):
+        return cls(_FAIL, error)
+
+    @classmethod
+    def lift(cls, io_action):
+        """
+        Runs an IO action, succeeding with its result
+        """
+        return cls(_LIFT, io_action.run)
+
+    @classmethod
+    def from_io(cls, io_action):
+        """
+        Runs an IO action whose result is a Maybe or an Either, failing
+        if it failed
+        """
+        return cls(_FROM, io_action.run)
+
+    @classmethod
+    def catch(cls, f, *args, **kwargs):
+        """
+        Calls f(*args, **kwargs) when run, failing with the captured
+        error if it raises
+        """
+        return cls(_CATCH, f, (args, kwargs, None))
+
+    @classmethod
+    def catch_with(cls, policy, f, *args, **kwargs):
+        """
+        Like :meth:`catch` but captures errors with `policy` instead of
+        the global capture policy; f is still only called when run
+
+        >>> from fp.monads.monad import capture_record
+        >>> action = EitherIO.catch_with(capture_record, int, "x")
+        >>> action.run()  # doctest: +ELLIPSIS
+        Left(ErrorRecord(ValueError, ("invalid literal for int()...",)))
+        """
+        return cls(_CATCH, f, (args, kwargs, policy))
+
+    @classmethod
+    def capture(cls, err, policy=None):
+        return cls._result_cls.capture(err, policy)
+
+    @classmethod
+    def run_do(cls, make_gen):
+        """
+        Returns an action that runs a :func:`fp.monads.monad.do` block
+        in the interpreter loop
+        """
+        return cls(_DO, make_gen)
+
+    def bind(self, f):
+        return type(self)(_BIND, self, f)
+
+    def to_io(self):
+        """
+        Returns the action as an IO of its result
+        """
+        from fp.monads.iomonad import IO
+        return IO(self.run)
+
+    def run(self):
+        """
+        Runs the action, returning its result.  Once a step fails the
+        later steps are not run.
+        """
+        result_cls = self._result_cls
+        stack = []
+        m = self
+
+        while True:
+            tag = m._tag
+            if tag == _BIND:
+                stack.append(m._b)
+                m = m._a
+                continue
+            elif tag == _PURE:
+                value = m._a
+            elif tag == _LIFT:
+                value = m._a()
+            elif tag == _FROM:
+                result = m._a()
+                value = result.default(_STOP)
+                if value is _STOP:
+                    return _stop(stack, result)
+            elif tag == _CATCH:
+                args, kwargs, policy = m._b
+                try:
+                    value = m._a(*args, **kwargs)
+                except Exception as e:
+                    return _stop(stack, result_cls.fail(
+                        self.capture(e, policy)))
+            elif tag == _DO:
+                stack.append(m._a())
+                value = None
+            else:
+                return _stop(stack, result_cls.fail(m._a))
+
+            # resume the innermost bind or do block with the value
+            while stack:
+                frame = stack[-1]
+                if type(frame) is GeneratorType:
+                    try:
+                        m = frame.send(value)
+                    except StopIteration as stop:
+                        stack.pop()
+                        value = _gen_return(stop)
+                        continue
+                else:
+                    stack.pop()
+                    m = frame(value)
+                break
+            else:
+                return result_cls.ret(value)
+
+
+def _stop(stack, result):
+    for frame in stack:
+        if type(frame) is GeneratorType:
+            frame.close()
+    return result
+
+
+class MaybeIO(_ResultIO):
+    """
+    An IO action that may result in Nothing, stopping the action.
+
+    >>> from fp.monads.iomonad import printLn
+    >>> from fp.monads.maybe import Just, Nothing
+
+    >>> action = MaybeIO.lift(printLn("looking up")).bind_(
+    ...     lambda: MaybeIO.catch(lambda: {'a': 1}['b'])).bind(
+    ...     lambda x: MaybeIO.lift(printLn(x)))
+
+    Nothing runs until the action is run, and the last step is skipped
+    because the lookup failed:
+
+    >>> action.run()
+    looking up
+    Nothing
+
+    IO actions that result in a Maybe are unwrapped without binding:
+
+    >>> from fp.monads.iomonad import IO
+    >>> MaybeIO.from_io(IO.ret(Just(1))).map(lambda x: x + 1).run()
+    Just(2)
+
+    Long chains run in constant stack:
+
+    >>> m = MaybeIO.ret(0)
+    >>> for _ in range(100000):
+    ...     m = m.bind(lambda x: MaybeIO.ret(x + 1))
+    >>> m.run()
+    Just(100000)
+
+    So do :func:`fp.monads.monad.do` blocks:
+
+    >>> from fp.monads.monad import do
+    >>> @do(MaybeIO)
+    ... def add(x):
+    ...     y = yield MaybeIO.from_io(IO.ret(Just(2)))
+    ...     return x + y
+    >>> add(1).run()
+    Just(3)
+    """
+    __slots__ = ()
+
+    _result_cls = Maybe
+
+
+class EitherIO(_ResultIO):
+    """
+    An IO action that may result in Left, stopping the action.
+
+    >>> from fp.monads.iomonad import printLn
+    >>> def divide(x, y):
+    ...     return EitherIO.lift(printLn("dividing")).bind_(
+    ...         lambda: EitherIO.catch(lambda: x // y))
+
+    >>> divide(4, 2).run()
+    dividing
+    Right(2)
+
+    >>> divide(4, 0).bind(lambda x: divide(x, 1)).run().is_left()
+    dividing
+    True
+    """
+    __slots__ = ()
+
+    _result_cls = Either
@@ -0,0 +1,312 @@
+from abc import ABCMeta, abstractmethod
+from six import moves
+import six
+from fp.monads.either import Left, Right
+from fp.monads.monad import get_capture_policy
+
+
+class _Concat(object):
+    """
+    A node of an error rope: the errors of `left` followed by the
+    errors of `right`.  Leaves are tuples of errors.
+    """
+    __slots__ = ("left", "right")
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+
+
+def _iter_rope(rope):
+    stack = [rope]
+    while stack:
+        node = stack.pop()
+        if type(node) is _Concat:
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            for err in node:
+                yield err
+
+
+class Validation(object):
+    """
+    Validation is like Either but collects every error instead of
+    stopping at the first one.  It is an applicative rather than a
+    monad: the validations being combined do not depend on each other.
+
+    >>> def positive(x):
+    ...     if x > 0:
+    ...         return Success(x)
+    ...     return Failure(["{0} is not positive".format(x)])
+
+    >>> Validation.mapM(positive, [1, 2, 3])
+    Success([1, 2, 3])
+
+    >>> Validation.mapM(positive, [1, -2, 3, -4])
+    Failure(['-2 is not positive', '-4 is not positive'])
+
+    Every error is found in a single pass over the values, and failures
+    are combined in constant time however many errors they hold.
+
+    >>> Validation.ap(lambda x, y: x + y, positive(-1), positive(-2))
+    Failure(['-1 is not positive', '-2 is not positive'])
+
+    Validations convert to and from Either:
+
+    >>> positive(-1).to_either()
+    Left(['-1 is not positive'])
+    >>> Validation.from_either(Right(1))
+    Success(1)
+    """
+    __metaclass__ = ABCMeta
+
+    @classmethod
+    def ret(cls, value):
+        return Success(value)
+
+    @classmethod
+    def fail(cls, error):
+        """
+        A failure with a single error
+
+        >>> Validation.fail("bad")
+        Failure(['bad'])
+        """
+        return Failure((error,))
+
+    @classmethod
+    def catch(cls, f, *args, **kwargs):
+        """
+        Execute f(*args, **kwargs), failing with the captured error if it
+        raises
+
+        >>> Validation.catch(int, "1")
+        Success(1)
+        >>> Validation.catch(int, "a").is_failure()
+        True
+        """
+        try:
+            return cls.ret(f(*args, **kwargs))
+        except Exception as e:
+            return cls.fail(get_capture_policy()(e))
+
+    @classmethod
+    def from_either(cls, either):
+        """
+        Converts Right(value) to Success(value) and Left(err) to a
+        failure with the single error `err`, unless `err` is a list,
+        which is taken as the list of errors so that from_either
+        inverts :meth:`to_either`
+
+        >>> Validation.from_either(Left("bad"))
+        Failure(['bad'])
+
+        >>> Validation.from_either(Failure(['a', 'b']).to_either())
+        Failure(['a', 'b'])
+        """
+        def failure(err):
+            if isinstance(err, list):
+                return Failure(err)
+            return cls.fail(err)
+        return either.either(failure, cls.ret)
+
+    @abstractmethod
+    def to_either(self):
+        """
+        Converts Success(value) to Right(value) and a failure to a Left
+        of the list of errors
+        """
+
+    @abstractmethod
+    def either(self, failure_fun, success_fun):
+        """
+        Execute failure_fun(errors) on Failure, success_fun(value) on
+        Success
+        """
+
+    @abstractmethod
+    def is_failure(self):
+        """
+        True if the Validation is a failure
+        """
+
+    def is_success(self):
+        """
+        True if the Validation is a success
+        """
+        return not self.is_failure()
+
+    @abstractmethod
+    def default(self, default):
+        """
+        Returns the value if success, the default value if failure.
+        """
+
+    @abstractmethod
+    def combine(self, other):
+        """
+        Returns the failure of both validations' errors if either
+        failed, otherwise `other`
+
+        >>> Failure(['a']).combine(Success(1)).combine(Failure(['b']))
+        Failure(['a', 'b'])
+        """
+
+    def map(self, f):
+        """
+        Calls a unary function with the value of a success
+
+        >>> Success("1").map(int)
+        Success(1)
+        >>> Failure(["bad"]).map(int)
+        Failure(['bad'])
+        """
+        return self.either(lambda _: self, lambda x: Success(f(x)))
+
+    @classmethod
+    def sequence(cls, vs):
+        """
+        Collects the values of the validations in `vs`, or every error
+        if any failed
+
+        >>> Validation.sequence([Success(1), Success(2)])
+        Success([1, 2])
+        >>> Validation.sequence([Failure(['a']), Success(2), Failure(['b'])])
+        Failure(['a', 'b'])
+        """
+        values = []
+        errors = []
+        for v in vs:
+            if v.is_failure():
+                errors.append(v._errors)
+            elif not errors:
+                values.append(v._value)
+        if errors:
+            return Failure(err for rope in errors for err in _iter_rope(rope))
+        return Success(values)
+
+    @classmethod
+    def sequence_dict(cls, d):
+        """
+        Collects the values of a dict of validations
+
+        >>> Validation.sequence_dict({"a": Success(1)})
+        Success({'a': 1})
+        >>> Validation.sequence_dict({"a": Failure(["bad"])})
+        Failure(['bad'])
+        """
+        keys = []
+        vs = []
+        for k, v in six.iteritems(d):
+            keys.append(k)
+            vs.append(v)
+        return cls.sequence(vs).map(lambda values: dict(zip(keys, values)))
+
+    @classmethod
+    def mapM(cls, f, items):
+        """
+        Validates each item with `f`, collecting every error
+        """
+        return cls.sequence(moves.map(f, items))
+
+    @classmethod
+    def ap(cls, f, *vs, **kwvs):
+        """
+        Calls a pure function with the values of validations, or
+        collects the errors of every failed argument
+
+        >>> Validation.ap(int, Success("1"))
+        Success(1)
+        >>> Validation.ap(dict, a=Failure(['bad a']), b=Success(2))
+        Failure(['bad a'])
+        """
+        keys = list(kwvs)
+        argsV = cls.sequence(list(vs) + [kwvs[k] for k in keys])
+        n = len(vs)
+
+        def call(values):
+            return f(*values[:n], **dict(zip(keys, values[n:])))
+
+        return argsV.map(call)
+
+
+class Success(Validation):
+    def __init__(self, value):
+        self._value = value
+
+    def __eq__(self, other):
+        return isinstance(other, Success) and self._value == other._value
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Success({0!r})".format(self._value)
+
+    def to_either(self):
+        return Right(self._value)
+
+    def either(self, _, success_fun):
+        return success_fun(self._value)
+
+    def is_failure(self):
+        """
+        >>> Success(1).is_failure()
+        False
+        """
+        return False
+
+    def default(self, _):
+        return self._value
+
+    def combine(self, other):
+        return other
+
+
+class Failure(Validation):
+    def __init__(self, errors):
+        # errors are kept as a rope so failures combine in O(1)
+        if type(errors) not in (tuple, _Concat):
+            errors = tuple(errors)
+        self._errors = errors
+
+    @property
+    def errors(self):
+        """
+        The list of errors
+
+        >>> Failure(['a']).combine(Failure(['b', 'c'])).errors
+        ['a', 'b', 'c']
+        """
+        return list(_iter_rope(self._errors))
+
+    def __eq__(self, other):
+        return isinstance(other, Failure) and self.errors == other.errors
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Failure({0!r})".format(self.errors)
+
+    def to_either(self):
+        return Left(self.errors)
+
+    def either(self, failure_fun, _):
+        return failure_fun(self.errors)
+
+    def is_failure(self):
+        """
+        >>> Failure(['bad']).is_failure()
+        True
+        """
+        return True
+
+    def default(self, default):
+        return default
+
+    def combine(self, other):
+        if other.is_failure():
+            return Failure(_Concat(self._errors, other._errors))
+        return self
@@ -0,0 +1,164 @@
+"""
+"""
+
+from fp.monads.monad import Monad, noop
+
+# interpreter frames
+_BIND = 0
+_LISTEN = 1
+_CENSOR = 2
+
+
+class Writer(Monad):
+    """
+    The Writer monad threads a log through a computation without side
+    effects.
+
+    >>> def half(x):
+    ...     return Writer.tell("halving {0}".format(x)).bind_(
+    ...         lambda: Writer.ret(x // 2))
+
+    >>> half(8).bind(half).run()
+    (2, ['halving 8', 'halving 4'])
+
+    Binds are not run as they are made; :meth:`run` interprets them
+    in a loop, appending entries to a single list, so telling is
+    amortized O(1) and long chains do not grow the stack:
+
+    >>> w = Writer.ret(0)
+    >>> for i in range(100000):
+    ...     w = w.bind(lambda n: Writer.tell(n).bind_(
+    ...         lambda n=n: Writer.ret(n + 1)))
+    >>> value, log = w.run()
+    >>> value, len(log), log[-1]
+    (100000, 100000, 99999)
+    """
+
+    @classmethod
+    def ret(cls, value):
+        return _Pure(value)
+
+    @classmethod
+    def fail(cls, exception):
+        """
+        A Writer cannot fail, the exception is raised
+
+        >>> Writer.fail(KeyError("key"))
+        Traceback (most recent call last):
+            ...
+        KeyError: 'key'
+        """
+        raise exception
+
+    @classmethod
+    def tell(cls, *entries):
+        """
+        Appends entries to the log
+
+        >>> Writer.tell("a", "b").run()
+        (noop, ['a', 'b'])
+        """
+        return _Tell(entries)
+
+    def bind(self, f):
+        return _Bind(self, f)
+
+    def listen(self):
+        """
+        Returns a Writer whose value is a pair of this writer's value and
+        the entries it logged
+
+        >>> Writer.tell("a").bind_(lambda: Writer.ret(1)).listen().run()
+        ((1, ['a']), ['a'])
+        """
+        return _Listen(self)
+
+    def censor(self, f):
+        """
+        Replaces the entries this writer logs with `f(entries)`
+
+        >>> Writer.tell("a", "b").censor(lambda log: log[::-1]).run()
+        (noop, ['b', 'a'])
+        """
+        return _Censor(self, f)
+
+    def run(self):
+        """
+        Runs the writer, returning the pair of its value and its log
+
+        >>> Writer.sequence([Writer.tell(1), Writer.ret(2)]).run()
+        ([noop, 2], [1])
+        """
+        log = []
+        stack = []
+        m = self
+
+        while True:
+            kind = type(m)
+            if kind is _Bind:
+                stack.append((_BIND, m.f))
+                m = m.m
+                continue
+            elif kind is _Listen:
+                stack.append((_LISTEN, len(log)))
+                m = m.m
+                continue
+            elif kind is _Censor:
+                stack.append((_CENSOR, len(log), m.f))
+                m = m.m
+                continue
+            elif kind is _Tell:
+                log.extend(m.entries)
+                value = noop
+            else:
+                value = m.value
+
+            while stack:
+                frame = stack.pop()
+                if frame[0] is _BIND:
+                    m = frame[1](value)
+                    break
+                elif frame[0] is _LISTEN:
+                    value = (value, log[frame[1]:])
+                else:
+                    start = frame[1]
+                    log[start:] = frame[2](log[start:])
+            else:
+                return value, log
+
+
+class _Pure(Writer):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class _Tell(Writer):
+    __slots__ = ("entries",)
+
+    def __init__(self, entries):
+        self.entries = entries
+
+
+class _Bind(Writer):
+    __slots__ = ("m", "f")
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
+
+
+class _Listen(Writer):
+    __slots__ = ("m",)
+
+    def __init__(self, m):
+        self.m = m
+
+
+class _Censor(Writer):
+    __slots__ = ("m", "f")
+
+    def __init__(self, m, f):
+        self.m = m
+        self.f = f
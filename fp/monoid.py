@@ -0,0 +1,194 @@
+"""
+The fp.monoid module provides monoids and folds built on them.
+
+A monoid is an `empty` value and an associative `combine` operation.
+Because `combine` is associative, a fold can be split into chunks that
+are folded separately, in parallel or at different times, and the
+partial results combined afterwards:
+
+    >>> from fp import identity
+    >>> fold_map(Sum, len, ["a", "bb", "ccc"])
+    6
+
+    >>> batch1 = fold_map(Max, identity, [3, 9, 2])
+    >>> batch2 = fold_map(Max, identity, [7, 1])
+    >>> Max.concat([batch1, batch2])
+    9
+"""
+import operator
+from six import moves
+from fp import atom, p, _par_map_chunks
+from fp.monads.maybe import Nothing, Just
+from fp.monads.either import Right
+
+
+# the empty value of the monoids with no natural one
+absent = atom("absent", __name__)
+
+
+class Monoid(object):
+    """
+    A monoid made from an `empty` value and an associative binary
+    `combine` function
+
+    >>> Monoid("", operator.add).concat(["a", "b", "c"])
+    'abc'
+    """
+    def __init__(self, empty, combine):
+        self.empty = empty
+        self.combine = combine
+
+    def concat(self, xs):
+        """
+        Combines all the values in `xs`
+
+        >>> Sum.concat([1, 2, 3])
+        6
+
+        >>> Sum.concat([])
+        0
+        """
+        return moves.reduce(self.combine, xs, self.empty)
+
+
+def _min(x, y):
+    if x is absent:
+        return y
+    elif y is absent:
+        return x
+    return y if y < x else x
+
+
+def _max(x, y):
+    if x is absent:
+        return y
+    elif y is absent:
+        return x
+    return y if y > x else x
+
+
+def _first(x, y):
+    return y if x is absent else x
+
+
+def _last(x, y):
+    return x if y is absent else y
+
+
+def _merge(x, y):
+    d = dict(x)
+    d.update(y)
+    return d
+
+
+Sum = Monoid(0, operator.add)
+Product = Monoid(1, operator.mul)
+Min = Monoid(absent, _min)
+Max = Monoid(absent, _max)
+First = Monoid(absent, _first)
+Last = Monoid(absent, _last)
+SetUnion = Monoid(frozenset(), operator.or_)
+DictMerge = Monoid({}, _merge)
+
+
+class DictMonoid(Monoid):
+    """
+    Merges dicts, combining the values of shared keys with a monoid
+
+    >>> DictMonoid(Sum).concat([{'a': 1}, {'a': 2, 'b': 1}]) == \\
+    ...     {'a': 3, 'b': 1}
+    True
+    """
+    def __init__(self, monoid):
+        self.monoid = monoid
+        self.empty = {}
+
+    def combine(self, x, y):
+        d = dict(x)
+        combine = self.monoid.combine
+        for k, v in y.items():
+            d[k] = combine(d[k], v) if k in d else v
+        return d
+
+
+class MaybeMonoid(Monoid):
+    """
+    Lifts a monoid into Maybe; Nothing is the empty value
+
+    >>> from fp.monads.maybe import Just, Nothing
+    >>> MaybeMonoid(Sum).concat([Just(1), Nothing, Just(2)])
+    Just(3)
+
+    >>> MaybeMonoid(Sum).concat([])
+    Nothing
+    """
+    def __init__(self, monoid):
+        self.monoid = monoid
+        self.empty = Nothing
+
+    def combine(self, x, y):
+        if x.is_nothing:
+            return y
+        elif y.is_nothing:
+            return x
+        return Just(self.monoid.combine(x.from_just, y.from_just))
+
+
+class EitherMonoid(Monoid):
+    """
+    Lifts a monoid into Either; the first Left is kept
+
+    >>> from fp.monads.either import Left, Right
+    >>> EitherMonoid(Sum).concat([Right(1), Right(2)])
+    Right(3)
+
+    >>> EitherMonoid(Sum).concat([Right(1), Left('bad'), Left('worse')])
+    Left('bad')
+    """
+    def __init__(self, monoid):
+        self.monoid = monoid
+        self.empty = Right(monoid.empty)
+
+    def combine(self, x, y):
+        combine = self.monoid.combine
+        return x.bind(lambda a: y.bind(lambda b: Right(combine(a, b))))
+
+
+def fold_map(monoid, f, xs, acc=None):
+    """..function::fold_map(monoid, f, xs[, acc=None])
+
+Maps `f` over `xs` and combines the results with `monoid`.
+
+Folding can be resumed from a previous result by passing it as `acc`:
+
+    >>> from fp import identity
+    >>> acc = fold_map(Sum, identity, [1, 2])
+    >>> fold_map(Sum, identity, [3, 4], acc)
+    10
+    """
+    combine = monoid.combine
+    if acc is None:
+        acc = monoid.empty
+    for x in xs:
+        acc = combine(acc, f(x))
+    return acc
+
+
+def _fold_chunk(monoid, f, chunk):
+    return fold_map(monoid, f, chunk)
+
+
+def par_fold_map(monoid, f, xs, chunksize=1024, executor=None):
+    """..function::par_fold_map(monoid, f, xs[, chunksize=1024][, executor])
+
+Like :func:`fold_map` but folds chunks of `chunksize` items on a
+`concurrent.futures` executor, a process pool by default, and combines
+the chunk results in order.  `monoid` and `f` must be picklable to
+run in a process pool.
+
+    >>> from fp import identity
+    >>> par_fold_map(Sum, identity, range(10000), chunksize=1000)
+    49995000
+    """
+    return monoid.concat(_par_map_chunks(
+        p(_fold_chunk, monoid, f), xs, chunksize, executor))
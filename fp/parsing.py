@@ -0,0 +1,364 @@
+"""
+The fp.parsing module provides packrat parser combinators.
+
+A :class:`Parser` is a Monad, sequencing parsers with `bind`, and a
+MonadPlus, choosing between them with `mplus`.  Choice is ordered: the
+first alternative that succeeds is used, as in a PEG.
+
+    >>> number = regex(r"[0-9]+").map(int)
+    >>> numbers = sep_by(number, literal(","))
+    >>> numbers.parse("1,22,333")
+    Right([1, 22, 333])
+
+    >>> numbers.bind_(lambda: eof).parse("1,x").is_left()
+    True
+
+Parsers never slice the input: they pass integer positions over the
+str, bytes, bytearray, mmap or memoryview being parsed and only copy
+the tokens they match.
+
+Backtracking parsers can take exponential time when alternatives share
+a prefix.  :meth:`Parser.memo` makes a packrat rule that remembers its
+result at each position of the input, which keeps parsing linear.
+"""
+import re
+from fp.monads.monad import Monad, MonadPlus, noop
+from fp.monads.either import Left, Right
+
+# returned by a parse function that did not match
+_FAIL = object()
+
+
+class ParseError(Exception):
+    """
+    Raised or returned when the input cannot be parsed; `pos` is the
+    farthest position reached
+    """
+    def __init__(self, pos):
+        Exception.__init__(self, "parse error at position {0}".format(pos))
+        self.pos = pos
+
+
+class _Context(object):
+    __slots__ = ("text", "memo", "farthest")
+
+    def __init__(self, text):
+        self.text = text
+        self.memo = {}
+        self.farthest = 0
+
+
+class Parser(Monad, MonadPlus):
+    """
+    A parser wraps a function of a parse context and a position that
+    returns a pair of the parsed value and the next position, or a
+    failure marker.
+    """
+
+    def __init__(self, fn):
+        self.__fn = fn
+
+    def __call__(self, ctx, pos):
+        return self.__fn(ctx, pos)
+
+    def parse(self, text, pos=0):
+        """
+        Parses `text` from `pos`, returning Right(value) or
+        Left(ParseError).  The parser does not need to consume all of
+        the input; bind to :data:`eof` for that.
+
+        >>> literal("ab").parse("abc")
+        Right('ab')
+        >>> literal("ab").parse("xbc")
+        Left(ParseError('parse error at position 0'))
+        """
+        ctx = _Context(text)
+        result = self.__fn(ctx, pos)
+        if result is _FAIL:
+            return Left(ParseError(ctx.farthest))
+        return Right(result[0])
+
+    ##=====================================================================
+    ## Monad methods
+    ##=====================================================================
+    @classmethod
+    def ret(cls, value):
+        """
+        Succeeds with `value` without consuming input
+
+        >>> Parser.ret(1).parse("")
+        Right(1)
+        """
+        return Parser(lambda ctx, pos: (value, pos))
+
+    @classmethod
+    def fail(cls, error):
+        return cls.mzero
+
+    @classmethod
+    def sequence(cls, ms):
+        """
+        Runs the parsers in `ms` one after another in a loop, returning
+        the list of their values, so long sequences and :meth:`mapM`
+        do not nest a bind per parser
+
+        >>> Parser.sequence([literal("a")] * 5000).parse(
+        ...     "a" * 5000).map(len)
+        Right(5000)
+        """
+        ms = list(ms)
+
+        def sequenced(ctx, pos):
+            values = []
+            for m in ms:
+                result = m(ctx, pos)
+                if result is _FAIL:
+                    return _FAIL
+                values.append(result[0])
+                pos = result[1]
+            return values, pos
+        return Parser(sequenced)
+
+    @classmethod
+    def sequence_(cls, ms):
+        """
+        Like :meth:`sequence` but keeps only the last parser's value
+
+        >>> Parser.mapM_(literal, ["a", "b"]).parse("ab")
+        Right('b')
+        """
+        ms = list(ms)
+
+        def sequenced(ctx, pos):
+            result = noop, pos
+            for m in ms:
+                result = m(ctx, pos)
+                if result is _FAIL:
+                    return _FAIL
+                pos = result[1]
+            return result
+        return Parser(sequenced)
+
+    def bind(self, f):
+        """
+        Runs this parser then the parser `f(value)` where it stopped
+
+        >>> two = regex("[a-z]").bind(lambda a: regex("[a-z]").bind(
+        ...     lambda b: Parser.ret(a + b)))
+        >>> two.parse("xy")
+        Right('xy')
+        """
+        fn = self.__fn
+
+        def bound(ctx, pos):
+            result = fn(ctx, pos)
+            if result is _FAIL:
+                return _FAIL
+            return f(result[0])(ctx, result[1])
+        return Parser(bound)
+
+    def map(self, f):
+        """
+        Applies `f` to the parsed value
+
+        >>> regex("[0-9]+").map(int).parse("42")
+        Right(42)
+        """
+        fn = self.__fn
+
+        def mapped(ctx, pos):
+            result = fn(ctx, pos)
+            if result is _FAIL:
+                return _FAIL
+            return f(result[0]), result[1]
+        return Parser(mapped)
+
+    def skip(self, other):
+        """
+        Runs this parser then `other`, keeping this parser's value
+
+        >>> regex("[0-9]+").skip(literal(";")).parse("12;")
+        Right('12')
+        """
+        return self.bind(lambda x: other.bind_(lambda: Parser.ret(x)))
+
+    ##=====================================================================
+    ## MonadPlus methods
+    ##=====================================================================
+    def mplus(self, y):
+        """
+        Ordered choice: tries this parser and, if it fails, `y` from the
+        same position
+
+        >>> literal("a").mplus(literal("b")).parse("b")
+        Right('b')
+        """
+        fn1 = self.__fn
+
+        def choice(ctx, pos):
+            result = fn1(ctx, pos)
+            if result is _FAIL:
+                return y(ctx, pos)
+            return result
+        return Parser(choice)
+
+    ##=====================================================================
+    ## Packrat memoization
+    ##=====================================================================
+    def memo(self):
+        """
+        Returns a packrat rule: the parser's result at each position is
+        computed once per parse and then reused.
+
+        This grammar tries two alternatives that both start with
+        `term`.  Without memo every level of nesting doubles the
+        work; with it parsing is linear:
+
+        >>> expr = lazy(lambda: expr_rule)
+        >>> term = literal("(").bind_(lambda: expr).skip(
+        ...     literal(")")).mplus(literal("x")).memo()
+        >>> expr_rule = term.skip(literal("+")).bind(
+        ...     lambda a: expr.map(lambda b: [a, b])).mplus(term).memo()
+        >>> expr.parse("(" * 30 + "x" + ")" * 30).is_right()
+        True
+        """
+        fn = self.__fn
+        key = object()
+
+        def memoized(ctx, pos):
+            table = ctx.memo.get(key)
+            if table is None:
+                table = ctx.memo[key] = {}
+            result = table.get(pos)
+            if result is None:
+                result = table[pos] = fn(ctx, pos)
+            return result
+        return Parser(memoized)
+
+
+def _fail_at(ctx, pos):
+    if pos > ctx.farthest:
+        ctx.farthest = pos
+    return _FAIL
+
+
+Parser.mzero = Parser(_fail_at)
+
+
+def regex(pattern, flags=0):
+    """
+    Matches a regular expression at the current position, returning the
+    matched text.  Use a bytes pattern to parse binary input.
+
+    >>> regex(br"[0-9]+").parse(memoryview(b"123abc"))
+    Right(b'123')
+    """
+    match = re.compile(pattern, flags).match
+
+    def token(ctx, pos):
+        m = match(ctx.text, pos)
+        if m is None:
+            return _fail_at(ctx, pos)
+        return m.group(), m.end()
+    return Parser(token)
+
+
+def literal(s):
+    """
+    Matches the literal string `s`
+
+    >>> literal(b"GET").parse(b"GET /")
+    Right(b'GET')
+    """
+    return regex(re.escape(s))
+
+
+def many(p):
+    """
+    Runs `p` as many times as it matches, returning the list of values
+
+    >>> many(literal("a")).parse("aab")
+    Right(['a', 'a'])
+    >>> many(literal("a")).parse("b")
+    Right([])
+    """
+    def repeat(ctx, pos):
+        values = []
+        while True:
+            result = p(ctx, pos)
+            if result is _FAIL or result[1] == pos:
+                return values, pos
+            values.append(result[0])
+            pos = result[1]
+    return Parser(repeat)
+
+
+def many1(p):
+    """
+    Like :func:`many` but `p` must match at least once
+
+    >>> many1(literal("a")).parse("b").is_left()
+    True
+    """
+    return p.bind(lambda x: many(p).map(lambda xs: [x] + xs))
+
+
+def sep_by(p, sep):
+    """
+    Matches zero or more `p` separated by `sep`, returning the values
+    of `p`
+
+    >>> sep_by(regex("[a-z]+"), literal(" ")).parse("ab cd ef")
+    Right(['ab', 'cd', 'ef'])
+    >>> sep_by(regex("[a-z]+"), literal(" ")).parse("")
+    Right([])
+    """
+    item = sep.bind_(lambda: p)
+
+    def separated(ctx, pos):
+        result = p(ctx, pos)
+        if result is _FAIL:
+            return [], pos
+        values = [result[0]]
+        pos = result[1]
+        while True:
+            result = item(ctx, pos)
+            if result is _FAIL:
+                return values, pos
+            values.append(result[0])
+            pos = result[1]
+    return Parser(separated)
+
+
+def optional(p, default=None):
+    """
+    Runs `p`, or returns `default` without consuming input if it fails
+
+    >>> optional(literal("-"), "").parse("1")
+    Right('')
+    """
+    return p.mplus(Parser.ret(default))
+
+
+def lazy(f):
+    """
+    A parser that calls `f()` to get the parser to run the first time it
+    is used.  This lets rules refer to rules defined after them.
+    """
+    cache = []
+
+    def deferred(ctx, pos):
+        if not cache:
+            cache.append(f())
+        return cache[0](ctx, pos)
+    return Parser(deferred)
+
+
+def _eof(ctx, pos):
+    if pos == len(ctx.text):
+        return None, pos
+    return _fail_at(ctx, pos)
+
+
+# matches only at the end of the input
+eof = Parser(_eof)
@@ -0,0 +1,233 @@
+"""
+The fp.sources module provides memory-mapped line and record sources
+for use with the iterators in :mod:`fp`.
+
+Lines are yielded as :class:`memoryview` slices over the mapped file so
+scanning a large file does not copy every line into a new string:
+
+    >>> import os, tempfile
+    >>> from fp import itake
+    >>> fd, path = tempfile.mkstemp()
+    >>> _ = os.write(fd, b"one\\ntwo\\nthree\\nfour\\n")
+    >>> os.close(fd)
+
+    >>> buf = mmap_file(path)
+    >>> [bytes(line) for line in itake(2, ilines(buf))]
+    [b'one\\n', b'two\\n']
+
+    >>> buf.close()
+    >>> os.remove(path)
+
+Every line view, and every unfinished :func:`ilines` iterator, holds
+an export of the mapped buffer, so `mmap.close()` raises BufferError
+until they have all been released.
+"""
+import mmap
+import os
+import re
+from array import array
+from six import moves
+
+
+def _finder(buf, sep):
+    """
+    Returns a function finding `sep` in `buf` from a position, like
+    `buf.find`, for buffers with or without a find method such as
+    memoryviews
+    """
+    if not sep:
+        raise ValueError("sep must not be empty")
+    if hasattr(buf, "find"):
+        return lambda pos: buf.find(sep, pos)
+    search = re.compile(re.escape(sep)).search
+
+    def find(pos):
+        m = search(buf, pos)
+        return -1 if m is None else m.start()
+    return find
+
+
+def mmap_file(path):
+    """..function::mmap_file(path) -> mmap | bytes
+
+Maps the file at `path` read-only into memory.
+
+Empty files cannot be mapped so an empty bytes object is returned for
+them instead; both support the buffer protocol used by :func:`ilines`.
+    """
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def ilines(buf, start=0, sep=b"\n"):
+    """..function::ilines(buf[, start=0][, sep=b"\\n"]) -> iterator
+
+Yields zero-copy :class:`memoryview` slices of each line in `buf`, a
+bytes-like object, starting at byte offset `start`.  Like file
+iteration, each line keeps its trailing separator.
+
+    >>> [bytes(line) for line in ilines(b"a\\nbb\\nccc")]
+    [b'a\\n', b'bb\\n', b'ccc']
+
+    >>> [bytes(line) for line in ilines(memoryview(b"a\\nbb"), start=2)]
+    [b'bb']
+
+The views and the iterator keep `buf` exported, so an mmap cannot be
+closed until they are released.  An empty `sep` raises ValueError:
+
+    >>> list(ilines(b"a", sep=b""))
+    Traceback (most recent call last):
+        ...
+    ValueError: sep must not be empty
+    """
+    find = _finder(buf, sep)
+    view = memoryview(buf)
+    end = len(view)
+    step = len(sep)
+    pos = start
+
+    while pos < end:
+        nl = find(pos)
+        if nl == -1:
+            nl = end
+        else:
+            nl += step
+        yield view[pos:nl]
+        pos = nl
+
+
+def irecords(decode, buf, start=0, sep=b"\n"):
+    """..function::irecords(decode, buf[, start=0][, sep=b"\\n"]) -> iterator
+
+Lazily decodes each line of `buf` with `decode`.  A line is only
+decoded when it is pulled from the iterator.
+
+    >>> from fp import idrop
+    >>> list(idrop(1, irecords(lambda l: int(l), b"1\\n2\\n3\\n")))
+    [2, 3]
+    """
+    return moves.map(decode, ilines(buf, start, sep))
+
+
+def iseek(offset, buf, sep=b"\n"):
+    """..function::iseek(offset, buf[, sep=b"\\n"]) -> iterator
+
+Yields the lines of `buf` starting at the first line that begins at
+or after the byte `offset`.  A partial line at `offset` is skipped.
+
+This is useful for splitting a large file into byte ranges.
+
+    >>> [bytes(line) for line in iseek(3, b"aa\\nbb\\ncc\\n")]
+    [b'bb\\n', b'cc\\n']
+
+    >>> [bytes(line) for line in iseek(4, b"aa\\nbb\\ncc\\n")]
+    [b'cc\\n']
+    """
+    if offset > 0 and buf[offset - 1:offset] != sep[-1:]:
+        nl = _finder(buf, sep)(offset)
+        offset = len(buf) if nl == -1 else nl + len(sep)
+    return ilines(buf, offset, sep)
+
+
+def line_index(buf, sep=b"\n"):
+    """..function::line_index(buf[, sep=b"\\n"]) -> array
+
+Returns an array of the byte offset of the start of every line in
+`buf`.
+
+    >>> list(line_index(b"a\\nbb\\nccc"))
+    [0, 2, 5]
+    """
+    find = _finder(buf, sep)
+    index = array("Q")
+    end = len(buf)
+    step = len(sep)
+    pos = 0
+
+    while pos < end:
+        index.append(pos)
+        nl = find(pos)
+        if nl == -1:
+            break
+        pos = nl + step
+    return index
+
+
+def sidecar_path(path):
+    """..function::sidecar_path(path) -> str
+
+Returns the path of the line index file kept next to `path`
+
+    >>> sidecar_path("/var/log/app.log")
+    '/var/log/app.log.idx'
+    """
+    return path + ".idx"
+
+
+def write_line_index(path, index):
+    """..function::write_line_index(path, index) -> None
+
+Writes a line index for the file at `path` to its sidecar file
+    """
+    with open(sidecar_path(path), "wb") as fh:
+        index.tofile(fh)
+
+
+def read_line_index(path):
+    """..function::read_line_index(path) -> array
+
+Reads the sidecar line index for the file at `path`.
+
+    >>> import os, tempfile
+    >>> fd, path = tempfile.mkstemp()
+    >>> _ = os.write(fd, b"a\\nbb\\nccc\\n")
+    >>> os.close(fd)
+    >>> buf = mmap_file(path)
+    >>> write_line_index(path, line_index(buf))
+    >>> list(read_line_index(path))
+    [0, 2, 5]
+
+    >>> buf.close()
+    >>> os.remove(sidecar_path(path))
+    >>> os.remove(path)
+    """
+    index = array("Q")
+    with open(sidecar_path(path), "rb") as fh:
+        index.frombytes(fh.read())
+    return index
+
+
+def idrop_lines(n, buf, index=None, sep=b"\n"):
+    """..function::idrop_lines(n, buf[, index=None][, sep=b"\\n"]) -> iterator
+
+Drops the first `n` lines of `buf`.
+
+When a line `index` (see :func:`line_index`) is given, the start of
+line `n` is found with a single lookup; otherwise the separators are
+found with :meth:`find` without creating the dropped lines.
+
+    >>> buf = b"a\\nbb\\nccc\\n"
+    >>> [bytes(line) for line in idrop_lines(2, buf)]
+    [b'ccc\\n']
+
+    >>> [bytes(line) for line in idrop_lines(1, buf, line_index(buf))]
+    [b'bb\\n', b'ccc\\n']
+
+    >>> list(idrop_lines(5, buf))
+    []
+    """
+    if index is not None:
+        start = index[n] if n < len(index) else len(buf)
+    else:
+        find = _finder(buf, sep)
+        step = len(sep)
+        start = 0
+        for _ in moves.range(n):
+            nl = find(start)
+            if nl == -1:
+                start = len(buf)
+                break
+            start = nl + step
+    return ilines(buf, start, sep)
@@ -0,0 +1,403 @@
+"""
+Pipelines whose stages run concurrently.
+
+Each stage of a :class:`Pipeline` runs in its own thread, connected to
+the next by a bounded queue, so an I/O-bound stage overlaps with a
+CPU-bound one instead of running in lockstep like chained generators.
+A stage may also spread its work over a pool of threads or processes.
+
+    >>> from fp import even
+    >>> def square(x):
+    ...     return x * x
+    >>> p = Pipeline(range(10)).map(square, workers=4).filter(even)
+    >>> list(p)
+    [0, 4, 16, 36, 64]
+
+A full queue blocks the stage feeding it, so a slow consumer holds
+back the whole pipeline and memory stays bounded.
+
+An error raised by any stage cancels the pipeline and is raised to the
+consumer:
+
+    >>> list(Pipeline([1, 0]).map(lambda x: 1 // x))
+    Traceback (most recent call last):
+        ...
+    ZeroDivisionError: integer division or modulo by zero
+"""
+import collections
+import threading
+import time
+from six import moves
+from six.moves import queue
+from fp import ichunk
+
+_END = object()
+
+# how often blocked stages check whether the run was cancelled
+_POLL = 0.05
+
+
+class _Map(object):
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, chunk):
+        f = self.f
+        return [f(x) for x in chunk]
+
+
+class _Filter(object):
+    def __init__(self, pred):
+        self.pred = pred
+
+    def __call__(self, chunk):
+        pred = self.pred
+        return [x for x in chunk if pred(x)]
+
+
+class _FlatMap(object):
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, chunk):
+        f = self.f
+        return [y for x in chunk for y in f(x)]
+
+
+class StageStats(object):
+    """
+    Counters of a running stage.  `queue_depth` is the number of chunks
+    waiting in the stage's input queue and `max_queue_depth` the most
+    seen waiting.
+    """
+    __slots__ = ("name", "items_in", "items_out", "max_queue_depth",
+                 "started", "finished", "_queue")
+
+    def __init__(self, name, input_queue):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.max_queue_depth = 0
+        self.started = None
+        self.finished = None
+        self._queue = input_queue
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    @property
+    def elapsed(self):
+        """
+        Seconds the stage has been running
+        """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def throughput(self):
+        """
+        Items output per second
+        """
+        elapsed = self.elapsed
+        return self.items_out / elapsed if elapsed else 0.0
+
+    def __repr__(self):
+        return ("StageStats({0!r}, items_in={1}, items_out={2}, "
+                "max_queue_depth={3})").format(
+                    self.name, self.items_in, self.items_out,
+                    self.max_queue_depth)
+
+
+class _Control(object):
+    """
+    State shared by the threads of a run: the first error raised and
+    whether the run was cancelled
+    """
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.error = None
+        self.lock = threading.Lock()
+
+    def fail(self, error):
+        with self.lock:
+            if self.error is None:
+                self.error = error
+        self.cancelled.set()
+
+    def put(self, q, item):
+        """
+        Puts `item` on `q`, returning False if the run was cancelled
+        while waiting for room
+        """
+        while not self.cancelled.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(self, q):
+        """
+        Gets an item from `q`, returning None if the run was cancelled
+        while waiting for one
+        """
+        while not self.cancelled.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                pass
+        return None
+
+
+class _Stage(object):
+    def __init__(self, name, task, workers, mode, ordered):
+        if mode not in ("thread", "process"):
+            raise ValueError("mode must be 'thread' or 'process'")
+        self.name = name
+        self.task = task
+        self.workers = workers
+        self.mode = mode
+        self.ordered = ordered
+
+    def _executor(self):
+        if self.mode == "process":
+            from concurrent.futures import ProcessPoolExecutor
+            return ProcessPoolExecutor(self.workers)
+        elif self.workers > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            return ThreadPoolExecutor(self.workers)
+        return None
+
+    def run(self, inq, outq, stats, control):
+        """
+        Runs the stage in the current thread until its input ends, the
+        run is cancelled or the task raises
+        """
+        executor = self._executor()
+        stats.started = time.time()
+
+        def chunks():
+            while True:
+                stats.max_queue_depth = max(
+                    stats.max_queue_depth, inq.qsize())
+                chunk = control.get(inq)
+                if chunk is None or chunk is _END:
+                    return
+                stats.items_in += len(chunk)
+                yield chunk
+
+        def emit(out):
+            stats.items_out += len(out)
+            return not out or control.put(outq, out)
+
+        try:
+            if executor is None:
+                complete = self._run_inline(chunks(), emit)
+            else:
+                complete = self._run_pooled(executor, chunks(), emit)
+            if complete and not control.cancelled.is_set():
+                control.put(outq, _END)
+        except Exception as e:
+            control.fail(e)
+        finally:
+            stats.finished = time.time()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def _run_inline(self, chunks, emit):
+        task = self.task
+        for chunk in chunks:
+            if not emit(task(chunk)):
+                return False
+        return True
+
+    def _run_pooled(self, executor, chunks, emit):
+        from concurrent.futures import as_completed, wait, FIRST_COMPLETED
+        # bound the work in flight so a slow consumer holds back reads
+        limit = 2 * self.workers
+        task = self.task
+
+        if self.ordered:
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(executor.submit(task, chunk))
+                while pending and (len(pending) >= limit or
+                                   pending[0].done()):
+                    if not emit(pending.popleft().result()):
+                        return False
+            for fut in pending:
+                if not emit(fut.result()):
+                    return False
+            return True
+
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(task, chunk))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    if not emit(fut.result()):
+                        return False
+        for fut in as_completed(pending):
+            if not emit(fut.result()):
+                return False
+        return True
+
+
+def _feed(source, chunksize, outq, stats, control):
+    stats.started = time.time()
+    try:
+        for chunk in ichunk(chunksize, source):
+            stats.items_out += len(chunk)
+            if not control.put(outq, list(chunk)):
+                return
+        control.put(outq, _END)
+    except Exception as e:
+        control.fail(e)
+    finally:
+        stats.finished = time.time()
+
+
+class Pipeline(object):
+    """
+    A pipeline of stages over the items of `source`.
+
+    Items travel between stages in chunks of `chunksize`, and each
+    queue holds at most `maxsize` chunks.  Building a pipeline runs
+    nothing; iterating it, or calling :meth:`run`, starts a thread per
+    stage plus one reading the source.
+    """
+    def __init__(self, source, chunksize=1, maxsize=16, stages=()):
+        self.source = source
+        self.chunksize = chunksize
+        self.maxsize = maxsize
+        self.stages = tuple(stages)
+
+    def _then(self, task, name, workers, mode, ordered):
+        name = name or "{0}-{1}".format(
+            type(task).__name__.strip("_").lower(), len(self.stages))
+        stage = _Stage(name, task, workers, mode, ordered)
+        return Pipeline(self.source, self.chunksize, self.maxsize,
+                        self.stages + (stage,))
+
+    def map(self, f, workers=1, mode="thread", ordered=True, name=None):
+        """
+        Adds a stage applying `f` to each item.
+
+        With `workers` greater than one, or `mode="process"`, items are
+        processed by a pool of `workers` threads or processes; process
+        stages need `f` to be picklable.  Unordered stages output
+        results as they complete.
+
+        >>> def slow_double(x):
+        ...     time.sleep(0.01 * (3 - x))
+        ...     return 2 * x
+        >>> sorted(Pipeline(range(3)).map(
+        ...     slow_double, workers=3, ordered=False))
+        [0, 2, 4]
+        """
+        return self._then(_Map(f), name, workers, mode, ordered)
+
+    def filter(self, pred, workers=1, mode="thread", ordered=True,
+               name=None):
+        """
+        Adds a stage keeping the items that satisfy `pred`
+        """
+        return self._then(_Filter(pred), name, workers, mode, ordered)
+
+    def flat_map(self, f, workers=1, mode="thread", ordered=True,
+                 name=None):
+        """
+        Adds a stage replacing each item with the items of `f(item)`
+
+        >>> list(Pipeline(["a b", "c"]).flat_map(str.split))
+        ['a', 'b', 'c']
+        """
+        return self._then(_FlatMap(f), name, workers, mode, ordered)
+
+    def run(self):
+        """
+        Starts the pipeline, returning a :class:`PipelineRun`
+        """
+        return PipelineRun(self)
+
+    def __iter__(self):
+        return iter(self.run())
+
+
+class PipelineRun(object):
+    """
+    A running pipeline; iterating it yields the output of the last
+    stage.  Closing it, or abandoning the iteration, cancels every
+    stage.
+
+    >>> run = Pipeline(range(100), chunksize=10).map(abs, name="abs").run()
+    >>> sum(run)
+    4950
+    >>> run.stats[1]  # doctest: +ELLIPSIS
+    StageStats('abs', items_in=100, items_out=100, max_queue_depth=...)
+    """
+    def __init__(self, pipeline):
+        self._control = control = _Control()
+        queues = [queue.Queue(pipeline.maxsize)
+                  for _ in moves.range(len(pipeline.stages) + 1)]
+        self._output = queues[-1]
+        self.stats = [StageStats("source", queue.Queue())]
+        self.stats.extend(StageStats(stage.name, inq)
+                          for stage, inq in zip(pipeline.stages, queues))
+
+        threads = [threading.Thread(
+            target=_feed,
+            args=(pipeline.source, pipeline.chunksize, queues[0],
+                  self.stats[0], control))]
+        for i, stage in enumerate(pipeline.stages):
+            threads.append(threading.Thread(
+                target=stage.run,
+                args=(queues[i], queues[i + 1], self.stats[i + 1],
+                      control)))
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        self._threads = threads
+        self._iterator = self._consume()
+
+    def _consume(self):
+        control = self._control
+        try:
+            while True:
+                chunk = control.get(self._output)
+                if chunk is None:
+                    if control.error is not None:
+                        raise control.error
+                    return
+                elif chunk is _END:
+                    return
+                for x in chunk:
+                    yield x
+        finally:
+            control.cancelled.set()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    next = __next__
+
+    def close(self):
+        """
+        Cancels the pipeline
+        """
+        self._iterator.close()
+        self._control.cancelled.set()
+
+    def join(self, timeout=None):
+        """
+        Waits for the pipeline's threads to stop
+        """
+        for thread in self._threads:
+            thread.join(timeout)